@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Host-side benchmark of the async_mqtt payload codecs (JSON vs binary PACK)
+Representative neomatrix and system payloads: encode / decode time and payload size
+
+Usage: python3 _tools/bench_codec.py [rounds]
+"""
+import sys
+import importlib.util
+from pathlib import Path
+from timeit import timeit
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CODEC_PATH = REPO_ROOT / "async_mqtt" / "package" / "codec.py"
+
+
+def load_codec():
+    """Import async_mqtt/package/codec.py without the micrOS package context"""
+    spec = importlib.util.spec_from_file_location("codec", CODEC_PATH)
+    codec = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(codec)
+    return codec
+
+
+def payloads():
+    """Representative command payloads and results"""
+    colormap = [(x, y, (x * 30 % 255, y * 30 % 255, (x + y) * 15 % 255)) for y in range(8) for x in range(8)]
+    return {
+        "neomatrix status": {"r": 10, "g": 3, "b": 0, "br": 40},
+        "neomatrix pixel cmd": {"x": 3, "y": 5, "color": [10, 3, 0], "show": True, "_cid": "c42"},
+        "neomatrix draw_colormap": {"bitmap": colormap},
+        "neomatrix get_colormap": colormap,
+        "system info": {"devfid": "node01", "version": "2.10.4-0", "board": "esp32s3", "uptime": "3 days 02:11:54",
+                        "cpu": 240, "mem": {"free": 8312450, "alloc": 131552}, "rssi": -61, "ip": "10.0.1.12",
+                        "tasks": ["mqtt.client", "mqtt.publisher", "mqtt.worker.0", "mqtt.worker.1"]},
+        "telemetry window": {"w": 10000, "m": {"temp": [21.25, 21.75, 21.5, 10, 21.5],
+                                              "hum": [40.0, 41.5, 40.75, 10, 41.0]}},
+    }
+
+
+def normalize(obj):
+    """Tuples are decoded as lists"""
+    if isinstance(obj, (list, tuple)):
+        return [normalize(item) for item in obj]
+    if isinstance(obj, dict):
+        return {key: normalize(value) for key, value in obj.items()}
+    return obj
+
+
+def bench(rounds=2000):
+    codec = load_codec()
+    codecs = (codec.JSON, codec.PACK)
+    print(f"[Codec bench] rounds: {rounds} (times in us / operation)")
+    print(f"{'payload':<26}{'codec':<7}{'bytes':>7}{'encode':>10}{'decode':>10}")
+    for name, obj in payloads().items():
+        for cdc in codecs:
+            encoded = cdc.dumps(obj)
+            decoded = cdc.loads(encoded)
+            if normalize(decoded) != normalize(obj):
+                raise AssertionError(f"{cdc.NAME} round trip failed: {name}")
+            encode_us = timeit(lambda: cdc.dumps(obj), number=rounds) / rounds * 1e6
+            decode_us = timeit(lambda: cdc.loads(encoded), number=rounds) / rounds * 1e6
+            size = len(encoded.encode() if isinstance(encoded, str) else encoded)
+            print(f"{name:<26}{cdc.NAME:<7}{size:>7}{encode_us:>10.1f}{decode_us:>10.1f}")
+    print("Note: json is a C module (CPython and MicroPython), PACK is pure Python:"
+          " it trades CPU time for payload size - compare on the device for absolute numbers.")
+
+
+if __name__ == "__main__":
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
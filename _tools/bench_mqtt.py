@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Host-side benchmark of the async_mqtt pipeline
+Drives the real async_mqtt/package/LM_mqtt_client.py with CPython stand-ins (_tools/mqtt_bench/standins)
+over a local in-process asyncio MQTT broker (_tools/mqtt_bench/broker.py).
+
+Phases:
+    commands - controller -> <devfid>/bench/<function> with _cid -> response: commands/s, p50/p99 latency
+    publish  - publish() throughput (device -> broker -> controller)
+    fast     - QoS 0 fast lane throughput (numbers)
+    outage   - store-and-forward: publish() while the broker is paused (--outage-ms), no message may be lost
+Allocations: tracemalloc peak and net (KiB) per phase (disable with --no-trace for timing only)
+
+Usage: python3 _tools/bench_mqtt.py --count 2000 --size 64 --rate 0 --window 8 --workers 2 --qos 1
+Regression gate: --min-cps 500 --max-p99-ms 20 (exit code 1 on violation)
+"""
+import sys
+import gc
+import json
+import asyncio
+import argparse
+import tracemalloc
+import importlib.util
+from pathlib import Path
+from time import perf_counter
+
+TOOLS_DIR = Path(__file__).resolve().parent
+PACKAGE_DIR = TOOLS_DIR.parent / "async_mqtt" / "package"
+STANDINS_DIR = TOOLS_DIR / "mqtt_bench" / "standins"
+
+
+def import_client():
+    """
+    Import LM_mqtt_client.py (and the async_mqtt package) with the stand-in modules on the path
+    :return: LM_mqtt_client module
+    """
+    sys.path.insert(0, str(TOOLS_DIR))
+    sys.path.insert(0, str(STANDINS_DIR))
+    spec = importlib.util.spec_from_file_location("async_mqtt", PACKAGE_DIR / "__init__.py",
+                                                  submodule_search_locations=[str(PACKAGE_DIR)])
+    package = importlib.util.module_from_spec(spec)
+    sys.modules["async_mqtt"] = package
+    spec.loader.exec_module(package)
+    spec = importlib.util.spec_from_file_location("LM_mqtt_client", PACKAGE_DIR / "LM_mqtt_client.py")
+    client = importlib.util.module_from_spec(spec)
+    sys.modules["LM_mqtt_client"] = client
+    spec.loader.exec_module(client)
+    return client
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class Phase:
+    """Phase measurement: duration and tracemalloc peak / net memory"""
+
+    def __init__(self, name, trace):
+        self.name = name
+        self.trace = trace
+        self.result = {"phase": name}
+
+    def __enter__(self):
+        gc.collect()
+        if self.trace:
+            tracemalloc.reset_peak()
+            self._memory = tracemalloc.get_traced_memory()[0]
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.result["seconds"] = round(perf_counter() - self._start, 3)
+        if self.trace:
+            current, peak = tracemalloc.get_traced_memory()
+            self.result["peak_kib"] = round((peak - self._memory) / 1024, 1)
+            self.result["net_kib"] = round((current - self._memory) / 1024, 1)
+
+
+class Controller:
+    """Remote side: sends commands, collects responses and published messages"""
+
+    def __init__(self, mqtt_client_class, port):
+        self.client = mqtt_client_class({'client_id': "bench-controller", 'server': "127.0.0.1", 'port': port})
+        self.handler = None
+        self._task = None
+
+    async def start(self, topic_filters):
+        await self.client.connect()
+        for topic_filter in topic_filters:
+            await self.client.subscribe(topic_filter, 0)
+        self._task = asyncio.get_running_loop().create_task(self._dispatch())
+
+    async def _dispatch(self):
+        async for topic, msg, _ in self.client.queue:
+            if self.handler is not None:
+                self.handler(topic, msg)
+
+    def close(self):
+        self._task.cancel()
+        self.client.close()
+
+
+async def wait_for(condition, timeout):
+    """:return: True if the condition is met within timeout seconds"""
+    end = perf_counter() + timeout
+    while not condition():
+        if perf_counter() > end:
+            return False
+        await asyncio.sleep(0.001)
+    return True
+
+
+async def run_commands(controller, devfid, args):
+    topic = f"{devfid}/bench/{args.function}"
+    data = "x" * args.size
+    sent, latencies = {}, []
+    window = asyncio.Semaphore(args.window)
+
+    def on_response(_topic, msg):
+        now = perf_counter()
+        cid = json.loads(msg).get("cid")
+        start = sent.pop(cid, None)
+        if start is not None:
+            latencies.append((now - start) * 1000)
+            window.release()
+
+    controller.handler = on_response
+    with Phase("commands", args.trace) as phase:
+        start = perf_counter()
+        for cid in range(args.count):
+            if args.rate > 0:
+                await asyncio.sleep(max(0.0, start + cid / args.rate - perf_counter()))
+            try:
+                await asyncio.wait_for(window.acquire(), args.timeout)
+            except asyncio.TimeoutError:
+                break
+            sent[cid] = perf_counter()
+            await controller.client.publish(topic, json.dumps({"data": data, "_cid": cid}), qos=args.qos)
+        await wait_for(lambda: len(latencies) >= args.count, args.timeout)
+    phase.result.update({"msgs": len(latencies), "lost": args.count - len(latencies),
+                         "msg_s": round(len(latencies) / phase.result["seconds"]),
+                         "p50_ms": round(percentile(latencies, 50), 2),
+                         "p99_ms": round(percentile(latencies, 99), 2)})
+    return phase.result
+
+
+async def run_publish(client, controller, devfid, args, path):
+    inst = client.MQTT.INSTANCE
+    data = "x" * args.size
+    received = [0]
+
+    def on_message(_topic, _msg):
+        received[0] += 1
+
+    controller.handler = on_message
+    with Phase(path, args.trace) as phase:
+        for value in range(args.count):
+            if path == "publish":
+                while inst.outbox.depth() >= inst.outbox.size:
+                    await asyncio.sleep(0)
+                client.publish(f"{devfid}/bench/out/publish", data)
+            else:
+                while inst.fastlane.depth() >= inst.fastlane.size:
+                    await asyncio.sleep(0)
+                client.fast("bench/out/fast", value)
+        await wait_for(lambda: received[0] >= args.count, args.timeout)
+    phase.result.update({"msgs": received[0], "lost": args.count - received[0],
+                         "msg_s": round(received[0] / phase.result["seconds"])})
+    return phase.result
+
+
+async def run_outage(client, broker, controller, devfid, args):
+    """
+    Store-and-forward over a broker outage: the blocked publisher times out (PUB_TIMEOUT),
+    outbox overflow and later messages are journaled, the journal is replayed after the outage
+    """
+    data = "x" * args.size
+    received = set()
+
+    def on_message(_topic, msg):
+        received.add(msg.split(b":", 1)[0])
+
+    client.store_forward(True, max_size=args.count * (args.size + 64), rate_ms=0)
+    client.MQTT.PUB_TIMEOUT = min(200, args.outage_ms)
+    controller.handler = on_message
+    with Phase("outage", args.trace) as phase:
+        broker.pause()
+        for value in range(args.count):
+            client.publish(f"{devfid}/bench/out/outage", f"{value}:{data}")
+            await asyncio.sleep(0)
+        await asyncio.sleep(args.outage_ms / 1000)
+        broker.resume()
+        await wait_for(lambda: len(received) >= args.count, args.timeout)
+    journal = client.MQTT.INSTANCE.journal.status()
+    client.store_forward(False)
+    phase.result.update({"msgs": len(received), "lost": args.count - len(received),
+                         "msg_s": round(len(received) / phase.result["seconds"]),
+                         "journal": journal})
+    return phase.result
+
+
+async def bench(args):
+    client = import_client()
+    from mqtt_bench.broker import Broker
+    import Common
+    import mqtt_as
+    if not args.fallback:
+        # Loaded target module: fast path (direct function call)
+        import LM_bench
+    Common.VERBOSE = args.verbose
+
+    broker = await Broker().start()
+    client.load("bench", "bench", "127.0.0.1", str(broker.port), qos=args.qos,
+                queue_size=args.queue, workers=args.workers)
+    inst = client.MQTT.INSTANCE
+    devfid = inst._DEVFID
+    if not await wait_for(lambda: f"{devfid}/+/+" in inst.subscribed, 5):
+        raise RuntimeError("LM_mqtt_client did not subscribe")
+    client.fast_lane(size=args.queue)
+    controller = Controller(mqtt_as.MQTTClient, broker.port)
+    await controller.start((f"{devfid}/bench/+/response", f"{devfid}/bench/out/+"))
+
+    if args.trace:
+        tracemalloc.start()
+    results = [await run_commands(controller, devfid, args),
+               await run_publish(client, controller, devfid, args, "publish"),
+               await run_publish(client, controller, devfid, args, "fast")]
+    if args.outage_ms:
+        results.append(await run_outage(client, broker, controller, devfid, args))
+    if args.trace:
+        tracemalloc.stop()
+    results.append({"phase": "device", "stats": client.stats(), "errors": Common.LOG[-5:]})
+
+    controller.close()
+    Common.kill_all()
+    inst.client.close()
+    await broker.stop()
+    return results
+
+
+def report(results, args):
+    print(f"[MQTT bench] count={args.count} size={args.size}B rate={args.rate or 'max'} window={args.window} "
+          f"workers={args.workers} qos={args.qos} path={'fallback' if args.fallback else 'fast'}"
+          f"{'' if args.trace else ' (no alloc trace)'}")
+    columns = ("phase", "msgs", "lost", "msg_s", "p50_ms", "p99_ms", "peak_kib", "net_kib")
+    print("".join(f"{c:>10}" for c in columns))
+    for result in results[:-1]:
+        print("".join(f"{str(result.get(c, '-')):>10}" for c in columns))
+    if args.trace:
+        print("Note: timings include tracemalloc overhead, use --no-trace for throughput numbers")
+
+
+def check(results, args):
+    """:return: list of regression gate violations"""
+    commands = results[0]
+    violations = []
+    if args.min_cps and commands["msg_s"] < args.min_cps:
+        violations.append(f"commands/s {commands['msg_s']} < {args.min_cps}")
+    if args.max_p99_ms and commands["p99_ms"] > args.max_p99_ms:
+        violations.append(f"p99 {commands['p99_ms']} ms > {args.max_p99_ms} ms")
+    violations.extend(f"{r['phase']}: {r['lost']} lost" for r in results[:-1] if r["lost"])
+    return violations
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Host-side async_mqtt pipeline benchmark")
+    parser.add_argument("--count", type=int, default=2000, help="Messages per phase")
+    parser.add_argument("--size", type=int, default=64, help="Payload size in bytes")
+    parser.add_argument("--rate", type=float, default=0, help="Command rate (msg/s), 0: as fast as the window allows")
+    parser.add_argument("--window", type=int, default=8, help="Max in-flight commands")
+    parser.add_argument("--workers", type=int, default=2, help="LM_mqtt_client worker tasks")
+    parser.add_argument("--queue", type=int, default=16, help="LM_mqtt_client outbox size")
+    parser.add_argument("--qos", type=int, default=1, choices=(0, 1), help="MQTT QoS")
+    parser.add_argument("--function", default="echo", choices=("echo", "size"), help="LM_bench target function")
+    parser.add_argument("--fallback", action="store_true", help="Target module not preloaded (lm_execute path)")
+    parser.add_argument("--no-trace", dest="trace", action="store_false", help="Disable tracemalloc")
+    parser.add_argument("--outage-ms", type=int, default=500, help="Broker outage of the store-and-forward phase, 0: skip")
+    parser.add_argument("--timeout", type=float, default=10, help="Phase drain timeout in seconds")
+    parser.add_argument("--min-cps", type=float, default=0, help="Fail below commands/s")
+    parser.add_argument("--max-p99-ms", type=float, default=0, help="Fail above command p99 latency")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Print console/syslog of the client")
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    results = asyncio.run(bench(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        report(results, args)
+    violations = check(results, args)
+    for violation in violations:
+        print(f"❌ {violation}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+"""
+Host-side MQTT pipeline benchmark for async_mqtt (see _tools/bench_mqtt.py)
+    - protocol: minimal MQTT 3.1.1 packet helpers
+    - broker: local in-process asyncio broker
+    - standins: CPython stand-ins of the micrOS / micropython modules used by LM_mqtt_client.py
+"""
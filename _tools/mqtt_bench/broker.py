@@ -0,0 +1,122 @@
+"""
+Minimal local asyncio MQTT broker for host-side benchmarks
+    - single process, no authentication, clean sessions only
+    - QoS 0/1 inbound (PUBACK), delivery to subscribers with QoS 0
+    - retained messages
+    - pause / resume: simulated outage, packets are not processed (clients see no acknowledgement)
+"""
+import asyncio
+import struct
+
+try:
+    from . import protocol as mqtt
+except ImportError:
+    import protocol as mqtt
+
+
+class Broker:
+
+    def __init__(self, host="127.0.0.1", port=0):
+        """
+        :param host: listen address
+        :param port: listen port, 0: ephemeral port (see self.port after start)
+        """
+        self.host = host
+        self.port = port
+        self.sessions = {}          # writer -> {topic filter: qos}
+        self.retained = {}          # topic -> payload
+        self.received = 0
+        self.delivered = 0
+        self._server = None
+        self._tasks = set()
+        self._online = asyncio.Event()
+        self._online.set()
+
+    def pause(self):
+        """Stop processing packets (broker unreachable, connections stay open)"""
+        self._online.clear()
+
+    def resume(self):
+        self._online.set()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._session, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self._server.close()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._server.wait_closed()
+
+    def _route(self, topic, payload, retain):
+        self.received += 1
+        topic_str = topic.decode()
+        if retain:
+            if payload:
+                self.retained[topic_str] = payload
+            else:
+                self.retained.pop(topic_str, None)
+        data = None
+        for writer, filters in self.sessions.items():
+            for topic_filter in filters:
+                if mqtt.matches(topic_filter, topic_str):
+                    if data is None:
+                        data = mqtt.publish_packet(topic, payload)
+                    writer.write(data)
+                    self.delivered += 1
+                    break
+
+    async def _session(self, reader, writer):
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        try:
+            await self._online.wait()
+            header, _ = await mqtt.read_packet(reader)
+            if header & 0xF0 != mqtt.CONNECT:
+                return
+            writer.write(mqtt.packet(mqtt.CONNACK, b"\x00\x00"))
+            filters = self.sessions[writer] = {}
+            while True:
+                await self._online.wait()
+                header, body = await mqtt.read_packet(reader)
+                kind = header & 0xF0
+                if kind == mqtt.PUBLISH:
+                    topic, payload, qos, retain, pid = mqtt.parse_publish(header, body)
+                    if qos:
+                        writer.write(mqtt.packet(mqtt.PUBACK, struct.pack(">H", pid)))
+                    self._route(topic, payload, retain)
+                elif kind == mqtt.SUBSCRIBE:
+                    pid = body[:2]
+                    pos, granted, new = 2, bytearray(), []
+                    while pos < len(body):
+                        topic_filter, pos = mqtt.read_string(body, pos)
+                        qos = min(body[pos], 1)
+                        pos += 1
+                        filters[topic_filter.decode()] = qos
+                        new.append(topic_filter.decode())
+                        granted.append(qos)
+                    writer.write(mqtt.packet(mqtt.SUBACK, pid + bytes(granted)))
+                    for topic, payload in self.retained.items():
+                        if any(mqtt.matches(f, topic) for f in new):
+                            writer.write(mqtt.publish_packet(topic, payload, retain=True))
+                elif kind == mqtt.UNSUBSCRIBE:
+                    pos = 2
+                    while pos < len(body):
+                        topic_filter, pos = mqtt.read_string(body, pos)
+                        filters.pop(topic_filter.decode(), None)
+                    writer.write(mqtt.packet(mqtt.UNSUBACK, body[:2]))
+                elif kind == mqtt.PINGREQ:
+                    writer.write(mqtt.packet(mqtt.PINGRESP))
+                elif kind == mqtt.DISCONNECT:
+                    return
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            # Client disconnected OR broker stopped
+            pass
+        finally:
+            self.sessions.pop(writer, None)
+            self._tasks.discard(task)
+            writer.close()
@@ -0,0 +1,96 @@
+"""
+Minimal MQTT 3.1.1 packet helpers (shared by the local broker and the mqtt_as stand-in)
+Supported: CONNECT/CONNACK, PUBLISH (QoS 0/1)/PUBACK, SUBSCRIBE/SUBACK, UNSUBSCRIBE/UNSUBACK, PINGREQ/PINGRESP, DISCONNECT
+"""
+import struct
+
+CONNECT = 0x10
+CONNACK = 0x20
+PUBLISH = 0x30
+PUBACK = 0x40
+SUBSCRIBE = 0x80
+SUBACK = 0x90
+UNSUBSCRIBE = 0xA0
+UNSUBACK = 0xB0
+PINGREQ = 0xC0
+PINGRESP = 0xD0
+DISCONNECT = 0xE0
+
+
+def encode_length(length):
+    """Remaining length (variable byte integer)"""
+    out = bytearray()
+    while True:
+        byte = length % 128
+        length //= 128
+        out.append(byte | 0x80 if length else byte)
+        if not length:
+            return bytes(out)
+
+
+def packet(header, body=b""):
+    return bytes([header]) + encode_length(len(body)) + body
+
+
+def string(value):
+    """Length prefixed UTF-8 string"""
+    data = value.encode() if isinstance(value, str) else bytes(value)
+    return struct.pack(">H", len(data)) + data
+
+
+def read_string(body, pos):
+    """:return: string bytes, next position"""
+    length = struct.unpack_from(">H", body, pos)[0]
+    return bytes(body[pos + 2:pos + 2 + length]), pos + 2 + length
+
+
+async def read_packet(reader):
+    """
+    Read one packet
+    :return: (header byte, body bytes)
+    :raise asyncio.IncompleteReadError: connection closed
+    """
+    header = (await reader.readexactly(1))[0]
+    length, shift = 0, 0
+    while True:
+        byte = (await reader.readexactly(1))[0]
+        length |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            break
+        shift += 7
+    body = await reader.readexactly(length) if length else b""
+    return header, body
+
+
+def publish_packet(topic, payload, qos=0, retain=False, pid=0):
+    body = string(topic)
+    if qos:
+        body += struct.pack(">H", pid)
+    return packet(PUBLISH | (qos << 1) | (1 if retain else 0), body + bytes(payload))
+
+
+def parse_publish(header, body):
+    """:return: topic bytes, payload bytes, qos, retain, packet id"""
+    qos = (header >> 1) & 0x03
+    topic, pos = read_string(body, 0)
+    pid = 0
+    if qos:
+        pid = struct.unpack_from(">H", body, pos)[0]
+        pos += 2
+    return topic, bytes(body[pos:]), qos, bool(header & 0x01), pid
+
+
+def matches(topic_filter, topic):
+    """MQTT topic filter match (+ and # wildcards)"""
+    levels = topic.split('/')
+    parts = topic_filter.split('/')
+    if topic.startswith('$') and parts[0] in ('+', '#'):
+        return False
+    for i, part in enumerate(parts):
+        if part == '#':
+            return True
+        if i >= len(levels):
+            return False
+        if part != '+' and part != levels[i]:
+            return False
+    return len(parts) == len(levels)
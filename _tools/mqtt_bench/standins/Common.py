@@ -0,0 +1,84 @@
+"""
+Common stand-in: micro_task / manage_task on asyncio, console and syslog collectors
+"""
+import asyncio
+import tempfile
+
+TASKS = {}
+LOG = []                    # syslog lines
+VERBOSE = False
+_DATA_DIR = tempfile.mkdtemp(prefix="micros_bench_")
+
+
+class MicroTask:
+
+    def __init__(self, tag):
+        self.tag = tag
+        self.out = ""
+        self.done = False
+        self.task = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.done = True
+
+    async def feed(self, sleep_ms=0):
+        await asyncio.sleep(sleep_ms / 1000)
+
+
+def micro_task(tag, task=None):
+    """
+    task=None: get task object (context manager with out and feed)
+    task=coroutine: start task (if the tag is not busy)
+    """
+    if task is None:
+        return TASKS.get(tag)
+    current = TASKS.get(tag)
+    if current is not None and not current.done:
+        task.close()
+        return {tag: "Already running"}
+    micro = TASKS[tag] = MicroTask(tag)
+    micro.task = asyncio.get_running_loop().create_task(task)
+    return {tag: "Starting"}
+
+
+def manage_task(tag, operation):
+    micro = TASKS.get(tag)
+    if operation == 'isbusy':
+        return micro is not None and not micro.done
+    if operation == 'show':
+        return "" if micro is None else micro.out
+    if operation == 'kill':
+        if micro is not None and not micro.done:
+            micro.task.cancel()
+            micro.done = True
+        return True
+    raise ValueError(f"Unknown operation: {operation}")
+
+
+def kill_all():
+    for tag in list(TASKS):
+        manage_task(tag, 'kill')
+    TASKS.clear()
+
+
+def console(msg):
+    if VERBOSE:
+        print(f"[console] {msg}")
+
+
+def syslog(msg):
+    LOG.append(msg)
+    if VERBOSE:
+        print(f"[syslog] {msg}")
+    return True
+
+
+def data_dir(f_name=None):
+    return _DATA_DIR if f_name is None else f"{_DATA_DIR}/{f_name}"
+
+
+def web_dir(f_name=None):
+    return data_dir(f_name)
@@ -0,0 +1,7 @@
+"""Config stand-in: static node configuration"""
+
+CONFIG = {"devfid": "benchdev", "staessid": "bench", "stapwd": "bench"}
+
+
+def cfgget(key=None):
+    return CONFIG if key is None else CONFIG.get(key)
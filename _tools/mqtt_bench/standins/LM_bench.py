@@ -0,0 +1,15 @@
+"""Benchmark target load module"""
+
+
+def echo(data=""):
+    """:return: payload echo"""
+    return data
+
+
+def size(data=""):
+    """:return: payload length"""
+    return len(data)
+
+
+def help(widgets=False):
+    return 'echo data=""', 'size data=""'
@@ -0,0 +1,36 @@
+"""
+Notify stand-in: device id and lm_execute (string argument load module call)
+"""
+import json
+from ast import literal_eval
+from importlib import import_module
+from Config import cfgget
+
+
+class Notify:
+    _DEVFID = cfgget("devfid")
+    _SUBSCRIBERS = []
+
+    @classmethod
+    def add_subscriber(cls, instance):
+        if instance not in cls._SUBSCRIBERS:
+            cls._SUBSCRIBERS.append(instance)
+
+    def lm_execute(self, cmd, jsonify=None, secure=True):
+        """
+        Load module call: [module, function, "key=value", ...]
+        :return: state, output (JSON string if jsonify)
+        """
+        kwargs = {}
+        for arg in cmd[2:]:
+            key, value = arg.split("=", 1)
+            try:
+                kwargs[key] = literal_eval(value)
+            except (ValueError, SyntaxError):
+                kwargs[key] = value
+        try:
+            output = getattr(import_module(f"LM_{cmd[0]}"), cmd[1])(**kwargs)
+            state = True
+        except Exception as e:
+            output, state = str(e), False
+        return state, json.dumps(output) if jsonify else output
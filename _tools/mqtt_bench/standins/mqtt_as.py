@@ -0,0 +1,173 @@
+"""
+mqtt_as stand-in: asyncio MQTT client with the mqtt_as interface used by LM_mqtt_client.py
+    - MQTTClient(config): connect, publish, subscribe, unsubscribe, isconnected, close
+    - up / down events, queue async iterator of (topic, msg, retained)
+    - like mqtt_as, publish does not raise during an outage: it waits for the (automatic) reconnection and retries,
+      a missing PUBACK within response_time is a broken link
+Talks MQTT 3.1.1 over TCP (e.g. to the local benchmark broker).
+"""
+import asyncio
+import struct
+from mqtt_bench import protocol as mqtt
+
+config = {
+    'client_id': "",
+    'server': "127.0.0.1",
+    'port': 1883,
+    'user': "",
+    'password': "",
+    'keepalive': 60,
+    'response_time': 10,
+    'queue_len': 1,
+    'will': None,
+}
+
+
+class MsgQueue:
+
+    def __init__(self):
+        self._queue = asyncio.Queue()
+
+    def put(self, item):
+        self._queue.put_nowait(item)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self._queue.get()
+
+
+class MQTTClient:
+    DEBUG = False
+
+    def __init__(self, cfg):
+        self._config = dict(config)
+        self._config.update(cfg)
+        self.up = asyncio.Event()
+        self.down = asyncio.Event()
+        self.queue = MsgQueue()
+        self._reader = None
+        self._writer = None
+        self._reader_task = None
+        self._connected = False
+        self._link = asyncio.Event()            # Set while connected (publish waits for it)
+        self._closed = False
+        self._reconnect_task = None
+        self._pid = 0
+        self._pending = {}          # packet id -> future (PUBACK / SUBACK / UNSUBACK)
+
+    def _next_pid(self):
+        self._pid = self._pid % 65535 + 1
+        return self._pid
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self._config['server'], int(self._config['port']))
+        body = mqtt.string("MQTT") + bytes([4, 0x02]) + struct.pack(">H", self._config['keepalive'])
+        body += mqtt.string(self._config['client_id'])
+        self._writer.write(mqtt.packet(mqtt.CONNECT, body))
+        header, ack = await mqtt.read_packet(self._reader)
+        if header & 0xF0 != mqtt.CONNACK or ack[1] != 0:
+            raise OSError("MQTT connection refused")
+        self._connected = True
+        self._link.set()
+        self._reader_task = asyncio.get_running_loop().create_task(self._read_loop(self._reader))
+        self.up.set()
+
+    async def _read_loop(self, reader):
+        try:
+            while True:
+                header, body = await mqtt.read_packet(reader)
+                kind = header & 0xF0
+                if kind == mqtt.PUBLISH:
+                    topic, payload, qos, retain, pid = mqtt.parse_publish(header, body)
+                    if qos:
+                        self._writer.write(mqtt.packet(mqtt.PUBACK, struct.pack(">H", pid)))
+                    self.queue.put((topic, payload, retain))
+                elif kind in (mqtt.PUBACK, mqtt.SUBACK, mqtt.UNSUBACK):
+                    future = self._pending.pop(struct.unpack_from(">H", body, 0)[0], None)
+                    if future is not None and not future.done():
+                        future.set_result(True)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if reader is self._reader:
+                # Not a replaced (old) connection
+                self._lost()
+
+    def _lost(self):
+        """Link is broken: fail the pending requests, reconnect in the background (mqtt_as)"""
+        if not self._connected:
+            return
+        self._connected = False
+        self._link.clear()
+        if self._writer is not None:
+            self._writer.close()
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(OSError("MQTT link lost"))
+        self._pending.clear()
+        self.down.set()
+        if not self._closed:
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self):
+        while not self._closed and not self._connected:
+            try:
+                await self.connect()
+            except OSError:
+                await asyncio.sleep(0.1)
+
+    async def _request(self, data, pid):
+        future = asyncio.get_running_loop().create_future()
+        self._pending[pid] = future
+        try:
+            self._writer.write(data)
+            await self._writer.drain()
+            await asyncio.wait_for(future, self._config['response_time'])
+        except asyncio.TimeoutError:
+            self._lost()
+            raise OSError("MQTT response timeout")
+        finally:
+            self._pending.pop(pid, None)
+
+    async def publish(self, topic, msg, retain=False, qos=0):
+        if isinstance(msg, str):
+            msg = msg.encode()
+        while True:
+            # mqtt_as: outage is not an error - wait for the reconnection and retry
+            await self._link.wait()
+            try:
+                if qos:
+                    pid = self._next_pid()
+                    await self._request(mqtt.publish_packet(topic, msg, 1, retain, pid), pid)
+                else:
+                    self._writer.write(mqtt.publish_packet(topic, msg, 0, retain))
+                    await self._writer.drain()
+                return
+            except OSError:
+                self._lost()
+
+    async def subscribe(self, topic, qos=0):
+        pid = self._next_pid()
+        body = struct.pack(">H", pid) + mqtt.string(topic) + bytes([qos])
+        await self._request(mqtt.packet(mqtt.SUBSCRIBE | 0x02, body), pid)
+
+    async def unsubscribe(self, topic):
+        pid = self._next_pid()
+        body = struct.pack(">H", pid) + mqtt.string(topic)
+        await self._request(mqtt.packet(mqtt.UNSUBSCRIBE | 0x02, body), pid)
+
+    def isconnected(self):
+        return self._connected
+
+    def close(self):
+        self._closed = True
+        if self._writer is not None:
+            self._writer.close()
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        self._connected = False
+        self._link.clear()
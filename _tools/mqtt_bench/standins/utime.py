@@ -0,0 +1,24 @@
+"""utime stand-in (CPython)"""
+import time
+
+_START = time.monotonic_ns()
+
+
+def ticks_ms():
+    return (time.monotonic_ns() - _START) // 1_000_000
+
+
+def ticks_us():
+    return (time.monotonic_ns() - _START) // 1_000
+
+
+def ticks_diff(end, start):
+    return end - start
+
+
+def ticks_add(ticks, delta):
+    return ticks + delta
+
+
+def sleep_ms(ms):
+    time.sleep(ms / 1000)
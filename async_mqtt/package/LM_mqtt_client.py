@@ -1,9 +1,27 @@
 import json
-from utime import ticks_ms
+import gc
+import asyncio
+from sys import modules
+from utime import ticks_ms, ticks_diff
 from mqtt_as import MQTTClient, config
 from Config import cfgget
-from Common import micro_task, console, syslog
+from Common import micro_task, console, syslog, data_dir
 from Notify import Notify
+from async_mqtt.outbox import Outbox, DROP_OLDEST, DROP_NEWEST
+from async_mqtt.router import Router
+from async_mqtt.journal import Journal
+from async_mqtt.cache import TTLCache
+from async_mqtt.ratelimit import RateLimiter
+from async_mqtt.telemetry import Aggregator
+from async_mqtt.rbe import DeadbandTable, fmt as rbe_fmt
+from async_mqtt.streaming import chunks
+from async_mqtt.fastlane import FastLane
+from async_mqtt.shadow import Shadow
+from async_mqtt.codec import JSON, PACK, is_packed
+from async_mqtt.stats import Stats, MSG_IN, BYTES_IN, MSG_OUT, BYTES_OUT, PUB_ERRORS, RECONNECTS, RECONNECT_MS
+
+
+BUSY_RESPONSE = '{"state": false, "result": "busy"}'
 
 
 class MQTT(Notify):
@@ -12,12 +30,37 @@ class MQTT(Notify):
     QOS: int = None
     DEBUG: bool = True
     DEFAULT_TOPIC: str = "micros/#"
+    OUTBOX_SIZE: int = 16
+    OUTBOX_POLICY: str = DROP_OLDEST
+    WORKERS: int = 2
+    WORKER_QUEUE: int = 4
+    BENCH_TIMEOUT: int = 10000          # Max. bench run time per path in ms (queue drain wait)
+    DEADLINE: int = 0                   # Default command deadline in ms (0: no deadline)
+    DEADLINES: dict = {}                # Per module command deadlines in ms {module: ms}
+    RESUB_MS: int = 1000                # Min. time between (re)subscription rounds in ms
+    RESUB_MAX_MS: int = 30000           # Max. retry backoff after a failed subscription round in ms
+    REPLAY_MS: int = 20                 # Store-and-forward replay rate limit (delay between messages) in ms
+    PUB_TIMEOUT: int = 5000             # Store-and-forward: max. publish wait in ms, then the message is journaled
+    DEDUP_PAYLOAD: bool = False         # Duplicate detection by topic + payload hash (without "_rid")
+    CACHEABLE: dict = {}                # Read-only commands result cache TTL in ms {"module/function": ms}
+    BUSY: bool = False                  # Publish busy response for shed (rate limited) commands
+    BROADCAST: str = "all"              # Fleet broadcast command prefix: all/<module>/<function>
+    GROUP: str = "group"                # Fleet group command prefix: group/<name>/<module>/<function>
+    GROUPS: set = set()                 # Group membership of the device
 
     # Micro Task TGS
     SUB_TASK = 'mqtt.subscribe'
-    UNSUB_TASK = 'mqtt.unsubscribe'
     CLIENT_TASK = 'mqtt.client'
     UP_TASK = 'mqtt.up'
+    PUB_TASK = 'mqtt.publisher'
+    WORKER_TASK = 'mqtt.worker'
+    REPLAY_TASK = 'mqtt.replay'
+    TELEMETRY_TASK = 'mqtt.telemetry'
+    RBE_TASK = 'mqtt.rbe'
+    FAST_TASK = 'mqtt.fast'
+    BENCH_TASK = 'mqtt.bench'
+    STATS_TASK = 'mqtt.stats'
+    SHADOW_TASK = 'mqtt.shadow'
 
     def __new__(cls, *args, **kwargs):
         if cls.INSTANCE is None:
@@ -31,7 +74,38 @@ class MQTT(Notify):
             return
         super().add_subscriber(self)
         self.client:MQTTClient = None
-        MQTT.DEFAULT_TOPIC = f"{self._DEVFID}/#"
+        self.outbox = Outbox(MQTT.OUTBOX_SIZE, MQTT.OUTBOX_POLICY)
+        self.outbox.on_drop = self._overflow            # Store-and-forward: journal the overflow drops
+        self.journal:Journal = None             # Store-and-forward journal (opt-in)
+        self.dedup = TTLCache(size=8, ttl_ms=10000)     # Idempotent command cache (QoS 1 redeliveries)
+        self.results = TTLCache(size=8, max_bytes=2048)  # Read-only command result cache (opt-in commands)
+        self.inflight = set()                           # Cacheable requests in progress: (topic, msg)
+        self.coalesced = 0                              # Requests coalesced into an in-progress execution
+        self.limiter = RateLimiter()                    # Inbound token buckets (load shedding)
+        self.shed = 0
+        self.telemetry:Aggregator = None                # Windowed telemetry aggregator (opt-in)
+        self.telemetry_topic = None                     # Telemetry publish topic (read by the task every window)
+        self.rbe:DeadbandTable = None                   # Report-by-exception table (created on first report)
+        self.fastlane:FastLane = None                   # QoS 0 telemetry fast lane (created on first use)
+        self.stats = Stats()                            # Counters and latency histograms
+        self.stats_period = 0                           # Periodic stats publish in ms (0: disabled)
+        self.stats_topic = None                         # Periodic stats publish topic (read by the task every period)
+        self.shadow = Shadow()                          # Device-state shadow (registered state providers)
+        self.shadow_period = 0                          # Shadow change detection period in ms (0: disabled)
+        self.shadow_topic = None                        # Shadow publish topic (read by the task every period)
+        # Command executor queues - one per worker task
+        self.jobs = [Outbox(MQTT.WORKER_QUEUE, DROP_NEWEST) for _ in range(MQTT.WORKERS)]
+        self.timeouts = 0
+        self.foreign = 0                        # Ignored group commands (not a member)
+        MQTT.DEFAULT_TOPIC = f"{self._DEVFID}/+/+"
+        # Topic router: built-in <devfid>/<module>/<function> command handler
+        self.router = Router()
+        self.router.add(MQTT.DEFAULT_TOPIC, self._dispatch)
+        # Subscription manager state
+        self.subscribed = {}                    # Active subscriptions on the broker: topic filter -> qos
+        self.sub_stats = [0, 0, 0]              # [rounds, last round ms, max round ms]
+        self._sub_event = asyncio.Event()       # (Re)subscription request
+        self._sub_reset = True                  # (Re)connected: broker has no subscriptions (clean session)
         self._initialized = True
 
     def init_client(self, username, password, server_ip, server_port):
@@ -77,13 +151,28 @@ class MQTT(Notify):
 
             # Initialize mqtt topics
             try:
-                micro_task(tag=MQTT.SUB_TASK, task=self._subscribe(MQTT.DEFAULT_TOPIC))
+                self._resubscribe()
+                micro_task(tag=MQTT.SUB_TASK, task=self._subscriber())
             except Exception as err:
                 syslog(f"Failed start mqtt subscribe: {err}")
             try:
                 micro_task(tag=MQTT.UP_TASK, task=self._up())
             except Exception as err:
                 syslog(f"Failed start mqtt up: {err}")
+            try:
+                micro_task(tag=MQTT.PUB_TASK, task=self._publisher())
+            except Exception as err:
+                syslog(f"Failed start mqtt publisher: {err}")
+            if self.fastlane is not None:
+                micro_task(tag=MQTT.FAST_TASK, task=self._fast_sender())
+            for index in range(len(self.jobs)):
+                try:
+                    tag = f"{MQTT.WORKER_TASK}.{index}"
+                    micro_task(tag=tag, task=self._worker(tag, self.jobs[index]))
+                except Exception as err:
+                    syslog(f"Failed start mqtt worker {index}: {err}")
+            # Replay stored messages from previous run
+            self._replay_start()
             # Async listener loop
             await self._receiver()
             my_task.out = "Receiver closed"
@@ -107,46 +196,238 @@ class MQTT(Notify):
     # SUBSCRIPTION \ PUBLISHING #
     #############################
 
-    async def _unsubscribe(self, topic: str):
+    def _resubscribe(self, reset=True):
         """
-        Unsubscribe from the specified MQTT topic.
-        :param topic: Topic string to unsubscribe from.
+        Request subscription round
+        :param reset: broker lost all subscriptions (connect/reconnect)
         """
-        with micro_task(tag=MQTT.UNSUB_TASK) as my_task:
-            my_task.out = "Started"
-            try:
-                console(f"Unsubscribe topic: {topic}")
-                await self.client.unsubscribe(topic)
-                my_task.out = "Done"
-            except Exception as e:
-                my_task.out = f"Error: {e}"
+        if reset:
+            self._sub_reset = True
+        self._sub_event.set()
 
-    async def _subscribe(self, topic: str):
+    async def _subscriber(self):
         """
-        Subscribe to the specified MQTT topic with the global QoS.
-        :param topic: Topic string to subscribe to.
+        Subscription manager task
+        - syncs the broker subscriptions with the router registry in one round (no task per topic)
+        - subscribes the minimal covering filter set with the registered (or global) QoS
+        - rate limited rounds (reconnect storms), round latency is measured
         """
         with micro_task(tag=MQTT.SUB_TASK) as my_task:
-            my_task.out = "Started"
-            try:
-                console(f"Subscribe topic: {topic}")
-                await self.client.subscribe(topic, qos=MQTT.QOS)
-                my_task.out = "Done"
-            except Exception as e:
-                my_task.out = f"Error: {e}"
+            last_round = ticks_ms() - MQTT.RESUB_MS
+            backoff = MQTT.RESUB_MS
+            while True:
+                my_task.out = f"Subscribed: {len(self.subscribed)} (last: {self.sub_stats[1]} ms)"
+                await self._sub_event.wait()
+                # Rate limit: merge requests within RESUB_MS into one round
+                wait_ms = MQTT.RESUB_MS - ticks_diff(ticks_ms(), last_round)
+                if wait_ms > 0:
+                    await my_task.feed(sleep_ms=wait_ms)
+                self._sub_event.clear()
+                last_round = ticks_ms()
+                if self._sub_reset:
+                    self._sub_reset = False
+                    self.subscribed.clear()
+                target = self.router.minimal(MQTT.QOS)
+                try:
+                    for topic, qos in target.items():
+                        if self.subscribed.get(topic) != qos:
+                            console(f"Subscribe topic: {topic}")
+                            await self.client.subscribe(topic, qos=qos)
+                            self.subscribed[topic] = qos
+                    for topic in [t for t in self.subscribed if t not in target]:
+                        console(f"Unsubscribe topic: {topic}")
+                        await self.client.unsubscribe(topic)
+                        self.subscribed.pop(topic)
+                except Exception as e:
+                    # Retry after backoff (doubled up to RESUB_MAX_MS) OR on the next up / route event
+                    my_task.out = f"Error: {e} (retry in {backoff} ms)"
+                    syslog(f"[ERR] mqtt subscribe: {e}")
+                    await my_task.feed(sleep_ms=backoff)
+                    backoff = min(backoff * 2, MQTT.RESUB_MAX_MS)
+                    self._sub_event.set()
+                    continue
+                backoff = MQTT.RESUB_MS
+                elapsed = ticks_diff(ticks_ms(), last_round)
+                self.sub_stats[0] += 1
+                self.sub_stats[1] = elapsed
+                self.sub_stats[2] = max(self.sub_stats[2], elapsed)
+
+    async def _publisher(self):
+        """
+        Single long-lived publisher task
+        - drains the outbound ring buffer (outbox) one message at a time
+        """
+        with micro_task(tag=MQTT.PUB_TASK) as my_task:
+            outbox = self.outbox
+            counters = self.stats.counters
+            latency = self.stats.publish
+            while True:
+                my_task.out = f"Wait (dropped: {outbox.dropped})"
+                topic, message, retain, enqueued_ms = await outbox.get()
+                journal = self.journal
+                if journal is not None and (journal.size > 0 or not self.client.isconnected()):
+                    # Store-and-forward: broker unreachable or stored messages first (keep order)
+                    if self._store(journal, topic, message, retain):
+                        self._replay_start()
+                        continue
+                    if not self.client.isconnected():
+                        continue
+                    # Journal refused the message (full) but the broker is reachable: publish directly
+                try:
+                    if journal is None:
+                        await self.client.publish(topic, message, qos=MQTT.QOS, retain=retain)
+                    else:
+                        # mqtt_as publish blocks during an outage (reconnect): journal the message on timeout
+                        await asyncio.wait_for(self.client.publish(topic, message, qos=MQTT.QOS, retain=retain),
+                                               MQTT.PUB_TIMEOUT / 1000)
+                    counters[MSG_OUT] += 1
+                    counters[BYTES_OUT] += len(message)
+                    latency.add(ticks_diff(ticks_ms(), enqueued_ms))
+                except Exception as e:
+                    counters[PUB_ERRORS] += 1
+                    syslog(f"[ERR] mqtt publish {topic}: {e}")
+                    if journal is not None:
+                        self._store(journal, topic, message, retain)
+
+    def _overflow(self, topic: str, message, retain: bool):
+        """
+        Outbox overflow callback - the dropped message is stored when store-and-forward is active
+        (e.g. publisher is waiting for the broker)
+        """
+        if self.journal is not None:
+            self._store(self.journal, topic, message, retain)
 
     @staticmethod
-    async def _publish(tag, message: str, topic: str, retain: bool):
+    def _store(journal, topic: str, message, retain: bool):
+        """
+        Store message in the journal, errors (e.g. flash write) are logged - the publisher task keeps running
+        :return: True if stored
+        """
+        try:
+            return journal.append(topic, message, retain)
+        except Exception as e:
+            journal.dropped += 1
+            syslog(f"[ERR] mqtt journal {topic}: {e}")
+            return False
+
+    async def _fast_sender(self):
+        """
+        QoS 0 fast lane sender task
+        - publishes the preallocated fast lane buffers with QoS 0 (fire-and-forget, no journal)
+        - messages are dropped while the broker is unreachable
+        """
+        with micro_task(tag=MQTT.FAST_TASK) as my_task:
+            counters = self.stats.counters
+            while True:
+                lane = self.fastlane
+                if lane.depth() == 0:
+                    my_task.out = f"Wait (sent: {lane.sent} dropped: {lane.dropped})"
+                await lane.wait()
+                if lane is not self.fastlane:
+                    # Reconfigured: continue with the new lane
+                    continue
+                topic, payload = lane.peek()
+                if not self.client.isconnected():
+                    lane.release(sent=False)
+                    continue
+                try:
+                    await self.client.publish(topic, payload, qos=0)
+                    lane.release()
+                    counters[MSG_OUT] += 1
+                    counters[BYTES_OUT] += len(payload)
+                except Exception as e:
+                    lane.release(sent=False)
+                    counters[PUB_ERRORS] += 1
+                    syslog(f"[ERR] mqtt fast publish: {e}")
+
+    async def _bench_wait(self, queue, limit: int, start: int):
+        """
+        Wait until the queue depth is below or equal to the limit
+        :return: False if BENCH_TIMEOUT is reached (e.g. broker unreachable)
+        """
+        while queue.depth() > limit:
+            if ticks_diff(ticks_ms(), start) > MQTT.BENCH_TIMEOUT:
+                return False
+            await asyncio.sleep(0)
+        return True
+
+    async def _bench(self, count: int):
+        """
+        Benchmark task: publish() vs QoS 0 fast lane
+        - count messages per path, enqueue with backpressure, wait until the queue is drained
+        - gc is disabled during a run: heap delta is the allocation per message
+        - a path is stopped after BENCH_TIMEOUT ms: {"timeout": ms, "sent": n}
+        :param count: number of messages per path
+        """
+        with micro_task(tag=MQTT.BENCH_TASK) as my_task:
+            my_task.out = "Running"
+            outbox = self.outbox
+            lane = self.fastlane
+            topic = f"{self._DEVFID}/bench"
+            value = 21.5
+            results = {}
+            for path in ("publish", "fast"):
+                gc.collect()
+                gc.disable()
+                try:
+                    heap, start = _heap(), ticks_ms()
+                    queue = outbox if path == "publish" else lane
+                    sent, done = 0, True
+                    for _ in range(count):
+                        done = await self._bench_wait(queue, queue.size - 1, start)
+                        if not done:
+                            break
+                        if path == "publish":
+                            self.publish(topic, str(value))
+                        else:
+                            fast("bench", value)
+                        sent += 1
+                    if done:
+                        done = await self._bench_wait(outbox, 0, start) and await self._bench_wait(lane, 0, start)
+                    elapsed = max(1, ticks_diff(ticks_ms(), start))
+                    if heap is not None:
+                        heap = (_heap() - heap) // count
+                finally:
+                    gc.enable()
+                if not done:
+                    results[path] = {"timeout": MQTT.BENCH_TIMEOUT, "sent": sent}
+                    break
+                results[path] = {"ms": elapsed, "msg_s": count * 1000 // elapsed, "alloc_b": heap}
+            my_task.out = json.dumps(results)
+
+    def _replay_start(self):
+        """Start journal replay task when connected and journal has stored messages"""
+        if self.journal is not None and self.journal.size > 0 and self.client.isconnected():
+            micro_task(tag=MQTT.REPLAY_TASK, task=self._replay())
+
+    async def _replay(self):
         """
-        Asynchronously publish a message to the given MQTT topic.
-        :param message: The message payload as a string.
-        :param topic: The MQTT topic string.
-        :param retain: Whether the message should be retained on the broker.
+        Store-and-forward replay task
+        - publishes the stored messages in order with REPLAY_MS rate limit
+        - compacts the journal after acknowledgement (interrupted replay) OR removes it (done)
         """
-        with micro_task(tag) as my_task:
-            my_task.out = f"Publishing {topic}"
-            await MQTT().client.publish(topic, message, qos=MQTT.QOS, retain=retain)
-            my_task.out = f"Publish {topic} done"
+        with micro_task(tag=MQTT.REPLAY_TASK) as my_task:
+            journal = self.journal
+            offset = 0
+            while self.client.isconnected():
+                record = journal.read(offset)
+                if record is None:
+                    # All stored messages were acknowledged
+                    journal.clear()
+                    offset = 0
+                    break
+                topic, message, retain, next_offset = record
+                try:
+                    await self.client.publish(topic, message, qos=MQTT.QOS, retain=retain)
+                except Exception as e:
+                    syslog(f"[ERR] mqtt replay {topic}: {e}")
+                    break
+                offset = next_offset
+                journal.replayed += 1
+                my_task.out = f"Replay: {journal.replayed} ({journal.size - offset} bytes left)"
+                await my_task.feed(sleep_ms=MQTT.REPLAY_MS)
+            journal.compact(offset)
+            my_task.out = f"Replay done: {journal.replayed} ({journal.size} bytes left)"
 
     def _publish_error(self, topic: str, error_msg: str):
         """
@@ -157,80 +438,520 @@ class MQTT(Notify):
         self.publish(topic=f"{topic}/response", message=error_msg)
         console(error_msg)
 
+    @staticmethod
+    def _is_command(topic: str):
+        """
+        Executable command topic check
+        - <devfid>/<module>/<function> and all/<module>/<function> (3 levels)
+        - group/<name>/<module>/<function>
+        """
+        levels = topic.count('/')
+        return levels == 2 or (levels == 3 and topic.startswith(f"{MQTT.GROUP}/"))
+
     @staticmethod
     def publish(topic: str, message: str, retain: bool = False):
         """
         Wrapper to publish a message to the specified topic.
-        Creates a micro_task for asynchronous publishing.
+        Enqueues the message into the outbox, sent by the publisher task.
         :param topic: MQTT topic string.
         :param message: Message string.
         :param retain: Whether to retain the message on the broker (default False).
         :return: Status message string.
         """
-        unique_tag = f'mqtt.publish.{topic}.{ticks_ms()}'
+        if MQTT._is_command(topic):
+            error = ("Error: Topic cannot consist of exactly three parts or be a group/<name>/<module>/<function> topic, "
+                     "as such topics are interpreted as executable commands.")
+            console(error)
+            return error
 
-        if len(topic.split('/')) == 3:
-            console(
-                "Error: Topic cannot consist of exactly three parts, as such topics are interpreted as executable commands.")
-            return "Error: Topic cannot consist of exactly three parts, as such topics are interpreted as executable commands."
-
-        state: dict = micro_task(tag=unique_tag, task=MQTT()._publish(unique_tag, message, topic, retain))
-        return f"Message was sent ({list(state.values())[0]})"
+        outbox = MQTT.INSTANCE.outbox
+        if outbox.put(topic, message, retain):
+            return f"Message was queued ({outbox.depth()}/{outbox.size})"
+        return f"Message was dropped, outbox full ({outbox.policy})"
 
     async def _receiver(self):
         """
         Asynchronous loop that listens for incoming MQTT messages from the subscribed topics.
-        - Decodes topic and message.
-        - Validates JSON payload, runs commands via Notify.lm_execute, and publishes a JSON-formatted response.
+        - Sheds rate limited messages early (before payload decoding).
+        - Decodes topic and message (packed payloads of command topics are passed as bytes).
+        - Calls the matching topic router handlers (topic is split once).
         """
+        router = self.router
+        limiter = self.limiter
+        counters = self.stats.counters
         async for topic, msg, retained in self.client.queue:
-            incoming_topic, msg = topic.decode(), msg.decode()
+            counters[MSG_IN] += 1
+            counters[BYTES_IN] += len(msg)
+            incoming_topic = topic.decode()
+            if limiter.active() and not limiter.allow(incoming_topic):
+                self.shed += 1
+                if MQTT.BUSY:
+                    # Fleet commands: busy reply on the own device response topic
+                    command = self._device_command(incoming_topic.split('/'))
+                    if command is not None:
+                        self.publish(topic=f"{command}/response", message=BUSY_RESPONSE)
+                continue
+            levels = incoming_topic.split('/')
+            if not (msg and is_packed(msg[0])) or self._device_command(levels) is None:
+                # Binary (packed) payloads are passed as bytes on command topics only
+                try:
+                    msg = msg.decode()
+                except UnicodeError:
+                    syslog(f"[ERR] mqtt payload is not text on {incoming_topic}")
+                    continue
             console(f'Topic: "{incoming_topic}" Message: "{msg}" Retained: {retained}')
 
-            topic_parts = incoming_topic.split('/')
-            if len(topic_parts) == 3:
-                payload = {}
-                if msg.strip():
-                    try:
-                        payload = json.loads(msg)
-                    except ValueError:
-                        self._publish_error(incoming_topic, f"Invalid payload JSON on topic {incoming_topic}: {msg}")
-                        continue
+            for handler in router.match(levels):
+                try:
+                    out = handler(incoming_topic, msg, retained)
+                    if hasattr(out, 'send'):
+                        # Async handler
+                        await out
+                except Exception as e:
+                    syslog(f"[ERR] mqtt handler {incoming_topic}: {e}")
+
+    async def _dispatch(self, incoming_topic: str, msg: str, retained: bool):
+        """
+        Built-in command handler: <devfid>/<module>/<function>
+        Dispatches command topics to the executor workers (same topic -> same worker, keeps order).
+        Identical cacheable requests in progress are coalesced into one execution (shared response).
+        """
+        if MQTT.CACHEABLE and incoming_topic[incoming_topic.index('/')+1:] in MQTT.CACHEABLE:
+            key = (incoming_topic, msg)
+            if key in self.inflight:
+                self.coalesced += 1
+                return
+            self.inflight.add(key)
+        jobs = self.jobs
+        # Wait for free slot in the selected worker queue (backpressure)
+        await jobs[hash(incoming_topic) % len(jobs)].push(incoming_topic, msg, retained)
 
-                args = [f'{k}="{v}"' if isinstance(v, str) else f'{k}={v}' for k, v in payload.items()]
+    def _device_command(self, levels: list):
+        """
+        Map a command topic to the own device command topic
+        - <devfid>/<module>/<function> OR all/<module>/<function> OR group/<name>/<module>/<function> (member)
+        Group membership is checked with one set lookup on the device.
+        :param levels: topic levels
+        :return: <devfid>/<module>/<function> or None (not a command of this device)
+        """
+        if len(levels) == 3 and levels[0] in (self._DEVFID, MQTT.BROADCAST):
+            return f"{self._DEVFID}/{levels[1]}/{levels[2]}"
+        if len(levels) == 4 and levels[0] == MQTT.GROUP and levels[1] in MQTT.GROUPS:
+            return f"{self._DEVFID}/{levels[2]}/{levels[3]}"
+        return None
 
-                cmd_parts = topic_parts[1:] + args
+    async def _fleet(self, incoming_topic: str, msg: str, retained: bool):
+        """
+        Fleet command handler: all/<module>/<function> OR group/<name>/<module>/<function>
+        Accepted commands are dispatched as <devfid>/<module>/<function> (response on the device response topic).
+        """
+        command = self._device_command(incoming_topic.split('/'))
+        if command is None:
+            self.foreign += 1
+            return
+        await self._dispatch(command, msg, retained)
 
-                state, output_json = self.lm_execute(cmd_parts, jsonify=True, secure=False)
+    async def _worker(self, tag, jobs):
+        """
+        Command executor task
+        :param tag: worker task tag
+        :param jobs: worker job queue (Outbox)
+        """
+        with micro_task(tag=tag) as my_task:
+            done = 0
+            latency = self.stats.execute
+            while True:
+                my_task.out = f"Idle (done: {done})"
+                incoming_topic, msg, _, received_ms = await jobs.get()
+                my_task.out = f"Exec {incoming_topic} (queued: {jobs.depth()})"
+                start_ms = ticks_ms()
                 try:
-                    output = json.loads(output_json)
-                except ValueError:
-                    output = output_json
+                    await self._execute(incoming_topic, msg, received_ms)
+                except Exception as e:
+                    syslog(f"[ERR] mqtt execute {incoming_topic}: {e}")
+                latency.add(ticks_diff(ticks_ms(), start_ms))
+                if self.inflight:
+                    self.inflight.discard((incoming_topic, msg))
+                done += 1
+                # Yield to the other tasks between commands
+                await my_task.feed()
+
+    def _publish_timeout(self, topic: str, elapsed_ms: int, reply: str, cid=None, codec=JSON):
+        """
+        Publish deadline exceeded response to the response topic.
+        :param topic: The original MQTT command topic.
+        :param elapsed_ms: time since the command was received
+        :param reply: response topic
+        :param cid: correlation id (echoed back)
+        :param codec: response codec
+        """
+        self.timeouts += 1
+        self._respond(reply, False, codec.dumps("timeout"), cid, codec)
+        console(f"Command timeout on {topic} after {elapsed_ms} ms")
+
+    async def _execute(self, incoming_topic: str, msg: str, received_ms: int):
+        """
+        Validate payload, run command, and publish a response encoded with the payload codec.
+        Codec: binary packed payload (msgpack map header byte) OR JSON (see codec.py)
+        Correlation ("_cid" payload field): echoed back in the response envelope (pipelined commands)
+        Response topic override ("_rtopic" payload field): default <incoming_topic>/response
+        Chunked response ("_chunk" payload field: frame size > 0): see _respond_chunked (deadline, dedup and result cache apply)
+        Duplicated request ("_rid" payload field OR topic + payload hash): cached response is republished
+        Cacheable (read-only) command: result is served from the result cache within its TTL
+        Deadline (ms): "_deadline" payload field OR per module default OR global default
+        - expired before execution: command is cancelled (not executed)
+        - overrun by execution: result is discarded
+        Both cases publish timeout response.
+        :param incoming_topic: <devfid>/<module>/<function> command topic
+        :param msg: JSON payload string OR packed payload bytes (function parameters)
+        :param received_ms: command receive timestamp (ticks_ms)
+        """
+        payload = {}
+        codec = PACK if isinstance(msg, bytes) else JSON
+        if codec is PACK or msg.strip():
+            try:
+                payload = codec.loads(msg)
+            except ValueError:
+                self._publish_error(incoming_topic, f"Invalid payload {codec.NAME} on topic {incoming_topic}: {msg}")
+                return
+            if not isinstance(payload, dict):
+                self._publish_error(incoming_topic, f"Payload must be a {codec.NAME} object on topic {incoming_topic}: {msg}")
+                return
+
+        cid = payload.pop("_cid", None)
+        reply = payload.pop("_rtopic", None)
+        if reply is None:
+            reply = f"{incoming_topic}/response"
+        elif not isinstance(reply, str) or not reply or '+' in reply or '#' in reply or self._is_command(reply):
+            self._publish_error(incoming_topic, f"Invalid _rtopic on topic {incoming_topic}: {reply}")
+            return
+
+        # Idempotent command cache: QoS 1 redelivery is not executed again
+        dedup_key = None
+        rid = payload.pop("_rid", None)
+        if self.dedup is not None:
+            if rid is not None:
+                dedup_key = f"{incoming_topic}:{rid}"
+            elif MQTT.DEDUP_PAYLOAD:
+                dedup_key = (incoming_topic, hash(msg))
+            if dedup_key is not None:
+                cached = self.dedup.get(dedup_key)
+                if cached is not None:
+                    console(f"Duplicated command on {incoming_topic}: republish response")
+                    if isinstance(cached[1], dict):
+                        # Chunked response: only the manifest is republished (frames are not streamed again)
+                        await self._publish_manifest(reply, cached[1], cid, codec)
+                    else:
+                        self._respond(reply, *cached, cid, codec)
+                    return
 
-                resp_payload = json.dumps({"state": state, "result": output})
-                self.publish(topic=f"{incoming_topic}/response", message=resp_payload)
+        module_function = incoming_topic.split('/')[1:]
+        deadline = payload.pop("_deadline", MQTT.DEADLINES.get(module_function[0], MQTT.DEADLINE))
+        if isinstance(deadline, bool) or not isinstance(deadline, (int, float)) or deadline < 0:
+            self._respond(reply, False, codec.dumps(f"Invalid _deadline: {deadline}"), cid, codec)
+            console(f"Invalid _deadline on topic {incoming_topic}: {deadline}")
+            return
+        if deadline:
+            elapsed = ticks_diff(ticks_ms(), received_ms)
+            if elapsed > deadline:
+                self._publish_timeout(incoming_topic, elapsed, reply, cid, codec)
+                return
+
+        chunk_size = payload.pop("_chunk", None)
+        if chunk_size is not None:
+            if isinstance(chunk_size, bool) or not isinstance(chunk_size, int) or chunk_size <= 0:
+                error = f"Invalid _chunk: {chunk_size}"
+            elif self._is_command(f"{reply}/0"):
+                # <reply>/<n> frames must not be command topics
+                error = f"Invalid _rtopic for chunked response: {reply}"
+            else:
+                error = None
+            if error is not None:
+                self._respond(reply, False, codec.dumps(error), cid, codec)
+                console(f"{error} on topic {incoming_topic}")
+                return
+
+        # Read-only command result cache (opt-in)
+        command = f"{module_function[0]}/{module_function[1]}"
+        cache_ttl = MQTT.CACHEABLE.get(command)
+        cache_key = cached = None
+        if cache_ttl:
+            cache_key = f"{command}?{json.dumps(payload)}" if payload else command
+            if codec is not JSON:
+                cache_key = f"{codec.NAME}:{cache_key}"
+            cached = self.results.get(cache_key)
+        if chunk_size is not None:
+            state, frames, result = self._chunked_result(module_function, payload, chunk_size, codec, cached)
+        elif cached is None:
+            state, result = self._lm_call(module_function, payload, codec)
+        else:
+            state, result = cached
+        if cache_ttl and cached is None and state and result is not None:
+            self.results.put(cache_key, (state, result), weight=len(result), ttl_ms=cache_ttl)
+        if deadline:
+            elapsed = ticks_diff(ticks_ms(), received_ms)
+            if elapsed > deadline:
+                self._publish_timeout(incoming_topic, elapsed, reply, cid, codec)
+                return
+        if chunk_size is not None:
+            # Duplicates get the manifest again (see dedup above)
+            result = await self._respond_chunked(reply, state, frames, cid, codec)
+        else:
+            self._respond(reply, state, result, cid, codec)
+        if dedup_key is not None:
+            self.dedup.put(dedup_key, (state, result))
+
+    @staticmethod
+    def _lm_function(module_function: list):
+        """
+        Get public function of a loaded load module
+        :param module_function: [module, function]
+        :return: callable or None (module not loaded / not public function)
+        """
+        module, function = module_function
+        lm = modules.get(f"LM_{module}")
+        func = None if lm is None or function.startswith('_') else getattr(lm, function, None)
+        return func if callable(func) else None
+
+    def _lm_call(self, module_function: list, payload: dict, codec=JSON):
+        """
+        Execute load module function
+        - FAST PATH: loaded module, typed payload values are passed as keyword arguments, result serialised once
+        - Fallback: Notify.lm_execute with string arguments (also loads the module for the next call)
+        :param module_function: [module, function]
+        :param payload: function keyword arguments
+        :param codec: result codec
+        :return: state, serialised result
+        """
+        func = self._lm_function(module_function)
+        if func is not None:
+            try:
+                return True, codec.dumps(func(**payload))
+            except Exception as e:
+                return False, codec.dumps(str(e))
+        args = [f'{k}="{v}"' if isinstance(v, str) else f'{k}={v}' for k, v in payload.items()]
+        state, output_json = self.lm_execute(module_function + args, jsonify=True, secure=False)
+        try:
+            output = json.loads(output_json)
+        except ValueError:
+            output = output_json
+            output_json = json.dumps(output_json)
+        if codec is not JSON:
+            return state, codec.dumps(output)
+        return state, output_json
+
+    def _respond(self, reply: str, state: bool, result, cid=None, codec=JSON):
+        """
+        Publish command response to the response topic.
+        The serialised result is spliced into the response envelope (no decode/encode round trip).
+        :param reply: response topic (default: <topic>/response)
+        :param state: command execution state
+        :param result: serialised command result (str / bytes)
+        :param cid: correlation id (echoed back)
+        :param codec: response codec (request codec)
+        """
+        self.publish(topic=reply, message=codec.envelope(state, result, cid))
+
+    def _chunked_result(self, module_function: list, payload: dict, size: int, codec=JSON, cached=None):
+        """
+        Execute command for a chunked response
+        :param module_function: [module, function]
+        :param payload: function keyword arguments
+        :param size: frame size (characters)
+        :param codec: response codec, binary results are encoded at once and sliced into frames
+        :param cached: (state, serialised result) from the result cache, None: execute
+        :return: (state, frames generator, serialised result - None if encoded incrementally or cached)
+        """
+        if cached is not None:
+            return cached[0], chunks(cached[1], size, serialised=True), None
+        func = self._lm_function(module_function)
+        if func is None or codec is not JSON:
+            # Fallback execution OR binary codec: result is already serialised
+            state, result = self._lm_call(module_function, payload, codec)
+            return state, chunks(result, size, serialised=True), result
+        try:
+            return True, chunks(func(**payload), size), None
+        except Exception as e:
+            return False, chunks(str(e), size), None
+
+    async def _respond_chunked(self, reply: str, state: bool, frames, cid=None, codec=JSON):
+        """
+        Stream the response in numbered frames
+        - frames: <reply>/<n> (JSON text of the result split into size long parts)
+        - terminating manifest: <reply> {"state": bool, "chunks": n, "bytes": total[, "cid": cid]}
+        Frames are generated incrementally and queued with backpressure: peak memory is bounded by the chunk size.
+        :param reply: response topic (default: <topic>/response)
+        :param state: command execution state
+        :param frames: frame generator (see _chunked_result)
+        :param cid: correlation id (echoed back in the manifest)
+        :param codec: response codec
+        :return: manifest without cid
+        """
+        count = total = 0
+        try:
+            for frame in frames:
+                await self.outbox.push(f"{reply}/{count}", frame)
+                count += 1
+                total += len(frame)
+        except Exception as e:
+            # Not serialisable result: stream is incomplete
+            state = False
+            syslog(f"[ERR] mqtt chunked response {reply}: {e}")
+        manifest = {"state": state, "chunks": count, "bytes": total}
+        await self._publish_manifest(reply, manifest, cid, codec)
+        return manifest
+
+    async def _publish_manifest(self, reply: str, manifest: dict, cid=None, codec=JSON):
+        """Publish chunked response manifest (queued after the frames)"""
+        if cid is not None:
+            manifest = dict(manifest)
+            manifest["cid"] = cid
+        await self.outbox.push(reply, codec.dumps(manifest))
+
+    async def _telemetry(self):
+        """
+        Telemetry aggregator task
+        - publishes one batched statistics document per window to telemetry_topic
+        """
+        with micro_task(tag=MQTT.TELEMETRY_TASK) as my_task:
+            while self.telemetry is not None:
+                aggregator = self.telemetry
+                my_task.out = f"Windows: {aggregator.windows} (dropped: {aggregator.dropped})"
+                await my_task.feed(sleep_ms=aggregator.window_ms)
+                doc = aggregator.flush()
+                if doc is not None:
+                    self.publish(topic=self.telemetry_topic, message=doc)
+            my_task.out = "Stopped"
+
+    def stats_status(self):
+        """
+        :return: counters, latency histograms, queue high-water marks [high_water, size], coalesced requests and drops
+        """
+        status = self.stats.status()
+        lane = self.fastlane
+        status["queues"] = {"outbox": [self.outbox.high_water, self.outbox.size],
+                            "workers": [[jobs.high_water, jobs.size] for jobs in self.jobs],
+                            "fast": None if lane is None else [lane.high_water, lane.size]}
+        status["coalesced"] = self.coalesced
+        status["drops"] = {"outbox": self.outbox.dropped, "shed": self.shed, "timeouts": self.timeouts,
+                           "fast": 0 if lane is None else lane.dropped,
+                           "journal": 0 if self.journal is None else self.journal.dropped}
+        return status
+
+    def stats_reset(self):
+        """
+        Reset counters, histograms and the reported queue high-water marks (to the current depth) and drops
+        """
+        self.stats.reset()
+        for queue in [self.outbox, self.fastlane] + self.jobs:
+            if queue is not None:
+                queue.high_water = queue.depth()
+                queue.dropped = 0
+        if self.journal is not None:
+            self.journal.dropped = 0
+        self.shed = self.timeouts = self.coalesced = 0
+
+    async def _stats_publisher(self):
+        """
+        Periodic stats publisher task - publishes to stats_topic
+        """
+        with micro_task(tag=MQTT.STATS_TASK) as my_task:
+            while self.stats_period > 0:
+                my_task.out = f"Publish every {self.stats_period} ms to {self.stats_topic}"
+                await my_task.feed(sleep_ms=self.stats_period)
+                if self.stats_period > 0:
+                    self.publish(topic=self.stats_topic, message=json.dumps(self.stats_status()))
+            my_task.out = "Stopped"
+
+    async def _shadow(self):
+        """
+        Device-state shadow task
+        - collects the registered state providers periodically
+        - publishes only the changed keys (JSON merge patch) as retained message to shadow_topic
+        - topic change: the full document is published first to the new topic
+        """
+        with micro_task(tag=MQTT.SHADOW_TASK) as my_task:
+            topic = self.shadow_topic
+            while self.shadow_period > 0:
+                patch = self.shadow.update()
+                if topic != self.shadow_topic:
+                    topic = self.shadow_topic
+                    self.publish(topic=topic, message=json.dumps(self.shadow.snapshot()), retain=True)
+                elif patch is not None:
+                    self.publish(topic=topic, message=json.dumps(patch), retain=True)
+                my_task.out = f"Version: {self.shadow.version} (errors: {self.shadow.errors})"
+                await my_task.feed(sleep_ms=self.shadow_period)
+            my_task.out = "Stopped"
+
+    async def _heartbeat(self, sweep_ms: int):
+        """
+        Report-by-exception heartbeat task
+        - republishes the last value of points over their max silence interval
+        :param sweep_ms: heartbeat check period in ms
+        """
+        with micro_task(tag=MQTT.RBE_TASK) as my_task:
+            while self.rbe is not None:
+                for topic, value, retain in self.rbe.heartbeats():
+                    self.publish(topic=topic, message=rbe_fmt(value), retain=retain)
+                my_task.out = f"Points: {len(self.rbe)} (sent: {self.rbe.sent})"
+                await my_task.feed(sleep_ms=sweep_ms)
 
     async def _up(self):
         """
         CLIENT LIFECYCLE
-        UP Listener task that waits for an MQTT 'up' event (reconnection) and re-subscribes to the default topic.
+        UP Listener task that waits for an MQTT 'down' -> 'up' event (reconnection) and re-subscribes to the default topic.
+        Reconnect count and outage duration are recorded.
         """
+        counters = self.stats.counters
         with micro_task(tag=MQTT.UP_TASK) as my_task:
             while True:
-                # Wait for UP Event - (re)subscribe
+                # Wait for DOWN Event - connection lost
                 my_task.out = "Wait"
+                await self.client.down.wait()
+                self.client.down.clear()
+                down_ms = ticks_ms()
+                # Wait for UP Event - (re)subscribe
+                my_task.out = "Down, wait for reconnect"
                 await self.client.up.wait()
                 self.client.up.clear()
-                state:dict = micro_task(tag=MQTT.SUB_TASK, task=self._subscribe(MQTT.DEFAULT_TOPIC))
-                my_task.out = f"Re-Subscription ({list(state.values())[0]})"
-                my_task.feed()
+                counters[RECONNECTS] += 1
+                counters[RECONNECT_MS] = ticks_diff(ticks_ms(), down_ms)
+                self._resubscribe()
+                self._replay_start()
+                my_task.out = "Re-Subscription requested"
+
+    def route(self, topic_filter: str, handler, qos: int = None):
+        """
+        Register topic filter handler and subscribe to the filter (when connected)
+        :param topic_filter: MQTT topic filter with + and # wildcards
+        :param handler: callback(topic:str, msg:str, retained:bool), can be async
+        :param qos: subscription QoS (None: global QoS)
+        """
+        self.router.add(topic_filter, handler, qos)
+        self._resubscribe(reset=False)
+        return f"Registered {topic_filter}"
+
+    def unroute(self, topic_filter: str, handler=None):
+        """
+        Remove topic filter handler, unsubscribe from the filter if no handler left
+        :param topic_filter: MQTT topic filter
+        :param handler: callback to remove, None: all handlers of the filter
+        """
+        if self.router.remove(topic_filter, handler):
+            self._resubscribe(reset=False)
+        return f"Removed {topic_filter}"
+
+def _heap():
+    """:return: allocated heap bytes, None if not available (CPython)"""
+    return gc.mem_alloc() if hasattr(gc, "mem_alloc") else None
 
 #############################
 #       Public functions    #
 #############################
 
 
-def load(username:str, password:str, server_ip:str, server_port:str='1883', qos:int=1):
+def load(username:str, password:str, server_ip:str, server_port:str='1883', qos:int=1,
+         queue_size:int=16, overflow:str='oldest', workers:int=2):
     """
     Configure, initialize, and start the MQTT client.
     Requires that the micropython-mqtt package is installed. You can install it with:
@@ -240,11 +961,25 @@ def load(username:str, password:str, server_ip:str, server_port:str='1883', qos:
     :param server_ip: Broker IP or hostname.
     :param server_port: MQTT port (default 1883).
     :param qos: MQTT Quality of Service level (0, 1, or 2). Controls delivery guarantee.
+    :param queue_size: Outbound message queue size (preallocated, default 16).
+    :param overflow: Outbound queue overflow policy: oldest / newest (default oldest).
+        Applied to an existing queue as well (queued messages are kept, shrink drops the oldest).
+    :param workers: Number of concurrent command executor tasks (default 2), fixed after the first load.
     :return: Status dict showing whether the client is starting or already running.
     """
     MQTTClient.DEBUG = MQTT.DEBUG
     MQTT.QOS = qos
+    MQTT.OUTBOX_SIZE = queue_size
+    MQTT.OUTBOX_POLICY = overflow
+    MQTT.WORKERS = max(1, workers)
     inst = MQTT()
+    # Already created instance (e.g. by publish or reload): apply the queue settings in place
+    inst.outbox.resize(queue_size, overflow)
+    if len(inst.jobs) != MQTT.WORKERS:
+        if inst.client is not None:
+            # Worker tasks are bound to their queues: the count is fixed after the first load
+            return f"Error: workers={len(inst.jobs)} already running, reboot to apply workers={MQTT.WORKERS}"
+        inst.jobs = [Outbox(MQTT.WORKER_QUEUE, DROP_NEWEST) for _ in range(MQTT.WORKERS)]
     inst.init_client(username, password, server_ip, server_port)
     return micro_task(tag=MQTT.CLIENT_TASK, task=inst.run_receiver())
 
@@ -260,6 +995,397 @@ def publish(topic:str, message:str, retain=False):
     return MQTT().publish(topic, message, retain)
 
 
+def outbox():
+    """
+    Get outbound message queue status.
+    :return: dict with depth, size, policy, dropped and high_water
+    """
+    return MQTT().outbox.status()
+
+
+def deadline(ms:int=None, module:str=None):
+    """
+    Set command execution deadline. Commands over deadline are cancelled
+    and {"state": false, "result": "timeout"} is published to <topic>/response
+    - payload "_deadline" field overrides it per request
+    :param ms: deadline in milliseconds (0: no deadline, None: get current settings)
+    :param module: load module name (without LM_) for per module default, None: global default
+    :return: deadline settings dict
+    """
+    if ms is not None:
+        if module is None:
+            MQTT.DEADLINE = ms
+        elif ms:
+            MQTT.DEADLINES[module] = ms
+        else:
+            MQTT.DEADLINES.pop(module, None)
+    return {"default": MQTT.DEADLINE, "modules": MQTT.DEADLINES, "timeouts": MQTT().timeouts}
+
+
+def subscribe(topic_filter:str, handler, qos:int=None):
+    """
+    [LM] Register topic handler from other load modules
+    :param topic_filter: MQTT topic filter with + and # wildcards, e.g. fleet/+/temp
+    :param handler: callback(topic:str, msg:str, retained:bool), can be async
+    :param qos: subscription QoS (None: global QoS)
+    """
+    return MQTT().route(topic_filter, handler, qos)
+
+
+def unsubscribe(topic_filter:str, handler=None):
+    """
+    [LM] Remove topic handler (unsubscribe when no handler left)
+    :param topic_filter: MQTT topic filter
+    :param handler: registered callback, None: all handlers of the filter
+    """
+    return MQTT().unroute(topic_filter, handler)
+
+
+def subscriptions():
+    """
+    Get subscription registry and broker subscriptions
+    :return: registered and subscribed {topic_filter: qos}, (re)subscription round count and latency (ms)
+    """
+    inst = MQTT()
+    rounds, last_ms, max_ms = inst.sub_stats
+    return {"registered": inst.router.filters, "subscribed": inst.subscribed,
+            "rounds": rounds, "last_ms": last_ms, "max_ms": max_ms}
+
+
+def fleet(groups:str=None, broadcast:bool=None):
+    """
+    Fleet command topics - one publish drives many devices
+    - broadcast: all/<module>/<function>
+    - group: group/<name>/<module>/<function> (executed only if the device is a member)
+    Responses are published on the device response topic: <devfid>/<module>/<function>/response
+    :param groups: comma separated group names ("": leave all groups, None: no change)
+    :param broadcast: subscribe to broadcast commands (None: no change)
+    :return: fleet status dict
+    """
+    inst = MQTT()
+    broadcast_topic = f"{MQTT.BROADCAST}/+/+"
+    group_topic = f"{MQTT.GROUP}/+/+/+"
+    if groups is not None:
+        MQTT.GROUPS = set(g.strip() for g in groups.split(',') if g.strip())
+    for topic, enable in ((broadcast_topic, broadcast), (group_topic, None if groups is None else len(MQTT.GROUPS) > 0)):
+        # Route once (handler identity), unroute the whole filter
+        if enable is None or enable == (topic in inst.router.filters):
+            continue
+        if enable:
+            inst.route(topic, inst._fleet)
+        else:
+            inst.unroute(topic)
+    return {"broadcast": broadcast_topic in inst.router.filters, "groups": list(MQTT.GROUPS),
+            "ignored": inst.foreign}
+
+
+def fast_lane(size:int=16, payload_size:int=24):
+    """
+    Configure the QoS 0 fast lane (fire-and-forget telemetry)
+    - preallocated message slots and payload buffers, one long-lived sender task
+    :param size: max number of queued messages
+    :param payload_size: max payload length in bytes
+    :return: fast lane status dict
+    """
+    inst = MQTT()
+    lane = inst.fastlane
+    if lane is None or lane.size != size or lane.payload_size != payload_size:
+        if lane is not None and lane.depth() > 0:
+            return "Fast lane busy, try again"
+        inst.fastlane = FastLane(size, payload_size)
+        if lane is not None:
+            # Wake the sender waiting on the old lane
+            lane.retire()
+    if inst.client is not None:
+        micro_task(tag=MQTT.FAST_TASK, task=inst._fast_sender())
+    return inst.fastlane.status()
+
+
+def fast(topic:str, value, decimals:int=2):
+    """
+    QoS 0 fire-and-forget publish to <devfid>/<topic> (high-rate telemetry)
+    - no per message task, tag string or topic validation
+    - numbers are written directly into preallocated buffers
+    - overflow or broker unreachable: the message is dropped
+    :param topic: short topic (registered and encoded on first use)
+    :param value: int / float (ASCII number) OR str / bytes payload
+    :param decimals: float fraction digits
+    :return: True if queued, False if dropped
+    """
+    lane = MQTT.INSTANCE.fastlane if MQTT.INSTANCE else None
+    if lane is None:
+        fast_lane()
+        lane = MQTT.INSTANCE.fastlane
+    tid = lane.topic_id(topic)
+    if tid is None:
+        tid = lane.register(topic, f"{MQTT.INSTANCE._DEVFID}/{topic}")
+    if isinstance(value, (int, float)):
+        return lane.put_number(tid, value, decimals)
+    return lane.put(tid, value.encode() if isinstance(value, str) else value)
+
+
+def bench(count:int=100):
+    """
+    Benchmark publish() vs QoS 0 fast lane on the device (<devfid>/bench topic)
+    - throughput (msg/s) and heap allocation per message (alloc_b)
+    - results: task show mqtt.bench
+    :param count: messages per path (max 500, gc is disabled during a run)
+    """
+    inst = MQTT()
+    if inst.client is None:
+        return "MQTT client is not loaded"
+    lane = inst.fastlane
+    # Keep the configured lane, start the sender if needed
+    status = fast_lane() if lane is None else fast_lane(lane.size, lane.payload_size)
+    if isinstance(status, str):
+        return status
+    return micro_task(tag=MQTT.BENCH_TASK, task=inst._bench(min(count, 500)))
+
+
+def stats(period_ms:int=None, topic:str="stats", reset:bool=False):
+    """
+    MQTT client instrumentation
+    - messages and bytes in/out, publish errors, reconnect count and last reconnect duration
+    - command execution and publish latency histograms (bucket upper bounds: le_ms)
+    - queue high-water marks and drops
+    :param period_ms: publish stats periodically to <devfid>/<topic> (0: stop, None: no change)
+    :param topic: stats topic (applied with period_ms, the running task picks it up from the next period)
+    :param reset: reset counters, histograms, queue high-water marks and drops
+    :return: stats dict
+    """
+    inst = MQTT()
+    if reset:
+        inst.stats_reset()
+    if period_ms is not None:
+        inst.stats_period = period_ms
+        inst.stats_topic = f"{inst._DEVFID}/{topic}"
+        if period_ms > 0:
+            micro_task(tag=MQTT.STATS_TASK, task=inst._stats_publisher())
+    status = inst.stats_status()
+    status["topic"] = inst.stats_topic if inst.stats_period > 0 else None
+    return status
+
+
+def shadow(period_ms:int=1000, topic:str="shadow"):
+    """
+    Device-state shadow: event-driven state deltas instead of polling commands
+    - registered state providers are collected every period_ms
+    - changed keys are published as JSON merge patch (retained) to <devfid>/<topic>
+    - every patch and snapshot contains the "_v" version counter
+    :param period_ms: change detection period in ms (0: stop)
+    :param topic: shadow topic (running task: the full document is published to the new topic)
+    :return: shadow status dict
+    """
+    inst = MQTT()
+    inst.shadow_period = period_ms
+    inst.shadow_topic = f"{inst._DEVFID}/{topic}"
+    if period_ms > 0:
+        micro_task(tag=MQTT.SHADOW_TASK, task=inst._shadow())
+    status = inst.shadow.status()
+    status["topic"] = inst.shadow_topic
+    return status
+
+
+def shadow_provider(name:str, provider=None):
+    """
+    Register / remove device-state shadow provider
+    Load modules can register themselves (when the mqtt client is loaded):
+        from LM_mqtt_client import shadow_provider
+        shadow_provider("neomatrix", status)
+    :param name: top level key in the shadow document
+    :param provider: callable without arguments OR "module.function" of a loaded LM, None: remove
+    :return: shadow status dict
+    """
+    inst = MQTT()
+    if provider is None:
+        inst.shadow.remove(name)
+    else:
+        inst.shadow.add(name, provider)
+    return inst.shadow.status()
+
+
+def snapshot(publish:bool=False, topic:str="shadow"):
+    """
+    Full device-state shadow document (last published state)
+    :param publish: publish the full document (retained) to <devfid>/<topic>
+    :param topic: shadow topic
+    :return: shadow document with "_v" version
+    """
+    inst = MQTT()
+    doc = inst.shadow.snapshot()
+    if publish:
+        inst.publish(topic=f"{inst._DEVFID}/{topic}", message=json.dumps(doc), retain=True)
+    return doc
+
+
+def store_forward(enable:bool=True, max_size:int=8192, rate_ms:int=20):
+    """
+    Offline store-and-forward mode for publishing (opt-in)
+    - messages are stored in a journal file on flash when the broker is unreachable
+    - replayed in order on reconnect, journal is compacted after acknowledgement
+    :param enable: enable (True) / disable (False) store-and-forward mode
+    :param max_size: max journal file size in bytes (new messages are dropped when full)
+    :param rate_ms: replay rate limit, delay between replayed messages in ms
+    :return: journal status dict
+    """
+    inst = MQTT()
+    MQTT.REPLAY_MS = rate_ms
+    if not enable:
+        inst.journal = None
+        return "Store-and-forward disabled"
+    if inst.journal is None:
+        inst.journal = Journal(data_dir("mqtt_journal.dat"), max_size)
+    inst.journal.max_size = max_size
+    return inst.journal.status()
+
+
+def dedup(ttl_ms:int=10000, size:int=8, payload:bool=False):
+    """
+    Idempotent command cache for QoS 1 redeliveries
+    - requests with "_rid" (request id) payload field are always deduplicated
+    - payload=True: requests without "_rid" are deduplicated by topic + payload hash
+    Duplicated requests within ttl_ms get the cached response republished instead of re-execution.
+    :param ttl_ms: duplicate detection window in ms (0: disable)
+    :param size: max number of cached responses (LRU)
+    :param payload: deduplicate by topic + payload hash
+    :return: cache status dict
+    """
+    inst = MQTT()
+    MQTT.DEDUP_PAYLOAD = payload
+    if ttl_ms <= 0:
+        inst.dedup = None
+        return "Command deduplication disabled"
+    if inst.dedup is None or inst.dedup.size != size:
+        inst.dedup = TTLCache(size=size, ttl_ms=ttl_ms)
+    inst.dedup.ttl_ms = ttl_ms
+    return inst.dedup.status()
+
+
+def result_cache(module:str=None, function:str=None, ttl_ms:int=1000, max_bytes:int=None):
+    """
+    TTL result cache for read-only commands (opt-in per command)
+    - cached results are served within ttl_ms without execution
+    - identical requests in progress are coalesced into one execution
+    :param module: load module name (without LM_), None: status only
+    :param function: read-only function name
+    :param ttl_ms: result time-to-live in ms (0: remove command from cache)
+    :param max_bytes: result cache memory cap in bytes (None: keep current)
+    :return: result cache status dict
+    """
+    inst = MQTT()
+    if max_bytes is not None:
+        inst.results.max_bytes = max_bytes
+        inst.results.clear()
+    if module is not None and function is not None:
+        command = f"{module}/{function}"
+        if ttl_ms > 0:
+            MQTT.CACHEABLE[command] = ttl_ms
+        else:
+            MQTT.CACHEABLE.pop(command, None)
+    status = inst.results.status()
+    status["commands"] = MQTT.CACHEABLE
+    status["inflight"] = len(inst.inflight)
+    status["coalesced"] = inst.coalesced
+    return status
+
+
+def rate_limit(rate:float=None, burst:int=10, prefix:str=None, busy:bool=None):
+    """
+    Token bucket rate limiting and load shedding for inbound messages
+    - global bucket (prefix=None) and per topic prefix buckets
+    - excess messages are dropped before payload decoding
+    :param rate: messages per second (0: remove bucket, None: status only)
+    :param burst: max burst of messages (bucket size)
+    :param prefix: topic prefix, e.g. "<devfid>/neomatrix" (None: global bucket)
+    :param busy: publish {"state": false, "result": "busy"} response for shed commands
+    :return: rate limiter status with drop counters
+    """
+    inst = MQTT()
+    if busy is not None:
+        MQTT.BUSY = busy
+    if rate is not None:
+        inst.limiter.set(rate, burst, prefix)
+    status = inst.limiter.status()
+    status["shed"] = inst.shed
+    return status
+
+
+def aggregate(window_ms:int=10000, topic:str="telemetry", size:int=16):
+    """
+    Start windowed telemetry aggregator
+    - samples are added with the sample function (min, max, mean, count, last per metric)
+    - one batched JSON document per window is published to <devfid>/<topic>
+    :param window_ms: aggregation window in ms (0: stop aggregator)
+    :param topic: telemetry sub-topic
+    :param size: max number of metrics
+    :return: aggregator status dict
+    """
+    inst = MQTT()
+    if window_ms <= 0:
+        inst.telemetry = None
+        return "Telemetry aggregator stopped"
+    if inst.telemetry is None or inst.telemetry.size != size:
+        inst.telemetry = Aggregator(size=size, window_ms=window_ms)
+    inst.telemetry.window_ms = window_ms
+    # Running task picks up the new topic from the next window
+    inst.telemetry_topic = f"{inst._DEVFID}/{topic}"
+    micro_task(tag=MQTT.TELEMETRY_TASK, task=inst._telemetry())
+    status = inst.telemetry.status()
+    status["topic"] = inst.telemetry_topic
+    return status
+
+
+def sample(metric:str, value:float):
+    """
+    [LM] Add telemetry sample to the aggregator window (O(1), no publish)
+    :param metric: metric name
+    :param value: numeric value
+    :return: True if recorded, False if dropped
+    """
+    telemetry = MQTT.INSTANCE.telemetry if MQTT.INSTANCE else None
+    if telemetry is None:
+        return False
+    return telemetry.sample(metric, value)
+
+
+def rbe(size:int=64, sweep_ms:int=1000):
+    """
+    Configure report-by-exception publishing (see report function)
+    :param size: max number of reported points (preallocated)
+    :param sweep_ms: heartbeat check period in ms
+    :return: report-by-exception status dict
+    """
+    inst = MQTT()
+    if inst.rbe is None or inst.rbe.size != size:
+        inst.rbe = DeadbandTable(size=size)
+    micro_task(tag=MQTT.RBE_TASK, task=inst._heartbeat(sweep_ms))
+    return inst.rbe.status()
+
+
+def report(topic:str, value:float, absolute:float=0, relative:float=0, heartbeat_ms:int=60000, retain:bool=False):
+    """
+    [LM] Report-by-exception publishing to <devfid>/<topic>
+    - publish only when the change exceeds the deadband (larger of absolute and relative)
+    - forced heartbeat publish after max silence interval
+    - deadband parameters are registered with the first report of the topic
+    :param topic: sub-topic
+    :param value: numeric value
+    :param absolute: absolute deadband
+    :param relative: relative deadband, ratio of the last sent value (0.05: 5%)
+    :param heartbeat_ms: max silence interval in ms (0: no heartbeat)
+    :param retain: retain flag for publishing
+    :return: True if published, False if suppressed
+    """
+    inst = MQTT()
+    if inst.rbe is None:
+        rbe()
+    topic = f"{inst._DEVFID}/{topic}"
+    if inst.rbe.report(topic, value, absolute, relative, heartbeat_ms, retain):
+        inst.publish(topic=topic, message=rbe_fmt(value), retain=retain)
+        return True
+    return False
+
+
 def get_config():
     """
     Get configuration for MQTT client.
@@ -274,6 +1400,25 @@ def help(widgets=False):
     :param widgets: Unused, reserved for extra help formatting.
     :return: Tuple of help strings.
     """
-    return ('load username:str password:str server_ip:str server_port:str="1883"',
+    return ('load username:str password:str server_ip:str server_port:str="1883" qos=1 queue_size=16 overflow="oldest/newest" workers=2',
             'get_config',
-            'publish topic:str message:str retain=False')
+            'outbox',
+            'subscriptions',
+            'stats period_ms=None topic="stats" reset=False',
+            'shadow period_ms=1000 topic="shadow"',
+            'shadow_provider name:str provider="module.function"',
+            'snapshot publish=False topic="shadow"',
+            'fleet groups=None broadcast=None',
+            'deadline ms=None module=None',
+            'store_forward enable=True max_size=8192 rate_ms=20',
+            'dedup ttl_ms=10000 size=8 payload=False',
+            'result_cache module=None function=None ttl_ms=1000 max_bytes=None',
+            'rate_limit rate=None burst=10 prefix=None busy=None',
+            'aggregate window_ms=10000 topic="telemetry" size=16',
+            'sample metric:str value:float',
+            'rbe size=64 sweep_ms=1000',
+            'report topic:str value:float absolute=0 relative=0 heartbeat_ms=60000 retain=False',
+            'publish topic:str message:str retain=False',
+            'fast_lane size=16 payload_size=24',
+            'fast topic:str value decimals=2',
+            'bench count=100')
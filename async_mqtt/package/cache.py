@@ -0,0 +1,99 @@
+"""
+Bounded LRU cache with TTL
+    - preallocated slots, dict key -> slot index
+    - expired entries are dropped on access
+    - least recently used entry is evicted when full (or over memory cap)
+"""
+
+from utime import ticks_ms, ticks_diff, ticks_add
+
+
+class TTLCache:
+
+    def __init__(self, size=8, ttl_ms=10000, max_bytes=None):
+        """
+        :param size: max number of cached entries (preallocated)
+        :param ttl_ms: default entry time-to-live in milliseconds
+        :param max_bytes: memory cap (sum of entry weights), None: no limit
+        """
+        self.size = size
+        self.ttl_ms = ttl_ms
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._index = {}                # key -> slot
+        self._keys = [None] * size
+        self._values = [None] * size
+        self._weights = [0] * size
+        self._expire = [0] * size       # Expiry time (ticks_ms)
+        self._used = [0] * size         # Last access sequence number (LRU)
+        self._seq = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _drop(self, slot):
+        self._index.pop(self._keys[slot], None)
+        self._keys[slot] = None
+        self._values[slot] = None
+        self.bytes -= self._weights[slot]
+        self._weights[slot] = 0
+
+    def _lru(self):
+        """:return: least recently used occupied slot or None"""
+        slot, oldest = None, self._seq + 1
+        for i in range(self.size):
+            if self._keys[i] is not None and self._used[i] < oldest:
+                slot, oldest = i, self._used[i]
+        return slot
+
+    def get(self, key):
+        """
+        :return: cached value or None (missing or expired)
+        """
+        slot = self._index.get(key)
+        if slot is not None:
+            if ticks_diff(self._expire[slot], ticks_ms()) >= 0:
+                self._seq += 1
+                self._used[slot] = self._seq
+                self.hits += 1
+                return self._values[slot]
+            self._drop(slot)
+        self.misses += 1
+        return None
+
+    def put(self, key, value, weight=0, ttl_ms=None):
+        """
+        Store value, evict the least recently used entries when full
+        :param key: cache key
+        :param value: value to cache
+        :param weight: entry size in bytes (memory cap)
+        :param ttl_ms: entry time-to-live, None: default
+        :return: True if cached, False if too big for the memory cap
+        """
+        slot = self._index.get(key)
+        if slot is not None:
+            self._drop(slot)
+        if self.max_bytes is not None:
+            if weight > self.max_bytes:
+                return False
+            while self.bytes + weight > self.max_bytes:
+                self._drop(self._lru())
+        if len(self._index) >= self.size:
+            self._drop(self._lru())
+        slot = self._keys.index(None)
+        self._seq += 1
+        self._keys[slot] = key
+        self._index[key] = slot
+        self._values[slot] = value
+        self._weights[slot] = weight
+        self.bytes += weight
+        self._expire[slot] = ticks_add(ticks_ms(), self.ttl_ms if ttl_ms is None else ttl_ms)
+        self._used[slot] = self._seq
+        return True
+
+    def clear(self):
+        for slot in range(self.size):
+            self._drop(slot)
+
+    def status(self):
+        return {"size": self.size, "ttl_ms": self.ttl_ms, "entries": len(self._index),
+                "bytes": self.bytes, "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,234 @@
+"""
+Payload codecs for MQTT commands and responses
+    - JSON: default text codec
+    - PACK: compact binary msgpack subset (nil, bool, int, float32, str, bin, array, map)
+Codec selection by the first payload byte (header byte):
+    msgpack map header (0x80-0x8f, 0xde, 0xdf) -> PACK, anything else -> JSON
+Responses are encoded with the codec of the request.
+"""
+
+import json
+import struct
+from struct import pack, unpack_from
+
+# Malformed packed payload errors (RecursionError is a RuntimeError, MicroPython raises RuntimeError)
+_DECODE_ERRORS = (IndexError, KeyError, TypeError, UnicodeError, RuntimeError, getattr(struct, "error", ValueError))
+
+
+def is_packed(header):
+    """
+    :param header: first payload byte (int)
+    :return: True if binary (msgpack map) payload
+    """
+    return 0x80 <= header <= 0x8f or header == 0xde or header == 0xdf
+
+
+class JsonCodec:
+    NAME = "json"
+
+    @staticmethod
+    def loads(msg):
+        return json.loads(msg)
+
+    @staticmethod
+    def dumps(obj):
+        return json.dumps(obj)
+
+    @staticmethod
+    def envelope(state, result, cid=None):
+        """
+        Response envelope, the encoded result is spliced in (no decode/encode round trip)
+        :param state: command state
+        :param result: JSON encoded result
+        :param cid: correlation id (not encoded)
+        """
+        state = "true" if state else "false"
+        if cid is None:
+            return f'{{"state": {state}, "result": {result}}}'
+        cid = json.dumps(cid)
+        return f'{{"state": {state}, "result": {result}, "cid": {cid}}}'
+
+
+class PackCodec:
+    NAME = "pack"
+
+    @staticmethod
+    def loads(msg):
+        try:
+            obj, pos = _unpack(msg, 0)
+        except _DECODE_ERRORS as e:
+            raise ValueError(f"Invalid packed payload: {e}")
+        if pos != len(msg):
+            raise ValueError("Invalid packed payload: trailing bytes")
+        return obj
+
+    @staticmethod
+    def dumps(obj):
+        out = bytearray()
+        _pack(obj, out)
+        return bytes(out)
+
+    @staticmethod
+    def envelope(state, result, cid=None):
+        """
+        Response envelope (map), the encoded result is spliced in
+        :param state: command state
+        :param result: packed result
+        :param cid: correlation id (not encoded)
+        """
+        out = bytearray(b'\x82' if cid is None else b'\x83')
+        _pack("state", out)
+        out.append(0xc3 if state else 0xc2)
+        _pack("result", out)
+        out.extend(result)
+        if cid is not None:
+            _pack("cid", out)
+            _pack(cid, out)
+        return bytes(out)
+
+
+def _header(out, size, fix, fix_max, code16, code32):
+    if size <= fix_max:
+        out.append(fix | size)
+    elif size <= 0xffff:
+        out.append(code16)
+        out.extend(pack('>H', size))
+    else:
+        out.append(code32)
+        out.extend(pack('>I', size))
+
+
+def _pack(obj, out):
+    """Encode object into the out bytearray"""
+    if obj is None:
+        out.append(0xc0)
+    elif obj is True:
+        out.append(0xc3)
+    elif obj is False:
+        out.append(0xc2)
+    elif isinstance(obj, int):
+        if 0 <= obj <= 0x7f:
+            out.append(obj)
+        elif -32 <= obj < 0:
+            out.append(obj & 0xff)
+        elif 0 < obj <= 0xff:
+            out.append(0xcc)
+            out.append(obj)
+        elif 0 < obj <= 0xffff:
+            out.append(0xcd)
+            out.extend(pack('>H', obj))
+        elif 0 < obj <= 0xffffffff:
+            out.append(0xce)
+            out.extend(pack('>I', obj))
+        elif -0x80 <= obj < 0:
+            out.append(0xd0)
+            out.extend(pack('>b', obj))
+        elif -0x8000 <= obj < 0:
+            out.append(0xd1)
+            out.extend(pack('>h', obj))
+        elif -0x80000000 <= obj < 0:
+            out.append(0xd2)
+            out.extend(pack('>i', obj))
+        else:
+            out.append(0xd3)
+            out.extend(pack('>q', obj))
+    elif isinstance(obj, float):
+        out.append(0xca)
+        out.extend(pack('>f', obj))
+    elif isinstance(obj, str):
+        data = obj.encode()
+        size = len(data)
+        if size <= 31:
+            out.append(0xa0 | size)
+        elif size <= 0xff:
+            out.append(0xd9)
+            out.append(size)
+        else:
+            _header(out, size, 0, -1, 0xda, 0xdb)
+        out.extend(data)
+    elif isinstance(obj, (bytes, bytearray)):
+        size = len(obj)
+        if size <= 0xff:
+            out.append(0xc4)
+            out.append(size)
+        else:
+            _header(out, size, 0, -1, 0xc5, 0xc6)
+        out.extend(obj)
+    elif isinstance(obj, (list, tuple)):
+        _header(out, len(obj), 0x90, 15, 0xdc, 0xdd)
+        for item in obj:
+            _pack(item, out)
+    elif isinstance(obj, dict):
+        _header(out, len(obj), 0x80, 15, 0xde, 0xdf)
+        for key, value in obj.items():
+            _pack(key, out)
+            _pack(value, out)
+    else:
+        raise TypeError(f"Can't pack {type(obj)}")
+
+
+# Fixed size value formats: code -> (struct format, size)
+_FIXED = {0xcc: ('>B', 1), 0xcd: ('>H', 2), 0xce: ('>I', 4), 0xcf: ('>Q', 8),
+          0xd0: ('>b', 1), 0xd1: ('>h', 2), 0xd2: ('>i', 4), 0xd3: ('>q', 8),
+          0xca: ('>f', 4), 0xcb: ('>d', 8)}
+# Variable size headers: code -> (length format, length size, kind)
+_SIZED = {0xd9: ('>B', 1, 's'), 0xda: ('>H', 2, 's'), 0xdb: ('>I', 4, 's'),
+          0xc4: ('>B', 1, 'b'), 0xc5: ('>H', 2, 'b'), 0xc6: ('>I', 4, 'b'),
+          0xdc: ('>H', 2, 'a'), 0xdd: ('>I', 4, 'a'),
+          0xde: ('>H', 2, 'm'), 0xdf: ('>I', 4, 'm')}
+
+
+def _unpack(buf, pos):
+    """
+    Decode one object
+    :return: object, next position
+    """
+    code = buf[pos]
+    pos += 1
+    if code <= 0x7f:
+        return code, pos
+    if code >= 0xe0:
+        return code - 0x100, pos
+    if code == 0xc0:
+        return None, pos
+    if code == 0xc2:
+        return False, pos
+    if code == 0xc3:
+        return True, pos
+    if code in _FIXED:
+        fmt, size = _FIXED[code]
+        if pos + size > len(buf):
+            raise IndexError("truncated")
+        return unpack_from(fmt, buf, pos)[0], pos + size
+    if 0xa0 <= code <= 0xbf:
+        kind, size = 's', code & 0x1f
+    elif 0x90 <= code <= 0x9f:
+        kind, size = 'a', code & 0x0f
+    elif 0x80 <= code <= 0x8f:
+        kind, size = 'm', code & 0x0f
+    else:
+        fmt, length, kind = _SIZED[code]
+        if pos + length > len(buf):
+            raise IndexError("truncated")
+        size = unpack_from(fmt, buf, pos)[0]
+        pos += length
+    if kind == 's' or kind == 'b':
+        if pos + size > len(buf):
+            raise IndexError("truncated")
+        data = bytes(buf[pos:pos + size])
+        return (data.decode() if kind == 's' else data), pos + size
+    if kind == 'a':
+        items = []
+        for _ in range(size):
+            item, pos = _unpack(buf, pos)
+            items.append(item)
+        return items, pos
+    obj = {}
+    for _ in range(size):
+        key, pos = _unpack(buf, pos)
+        obj[key], pos = _unpack(buf, pos)
+    return obj, pos
+
+
+JSON = JsonCodec
+PACK = PackCodec
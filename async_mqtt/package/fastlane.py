@@ -0,0 +1,184 @@
+"""
+QoS 0 fire-and-forget fast lane for high-rate telemetry
+    - topics are registered once (pre-encoded bytes, referenced by slot id)
+    - payloads are written into preallocated buffers (numbers without string formatting)
+    - drained by one long-lived sender task (no task, tuple or string per message)
+Overflow: the new message is dropped (in-flight buffers are never overwritten)
+"""
+
+import asyncio
+from array import array
+
+
+class FastLane:
+
+    def __init__(self, size=16, payload_size=24):
+        """
+        :param size: max number of queued messages (preallocated)
+        :param payload_size: max payload length in bytes (preallocated per slot)
+        """
+        self.size = size
+        self.payload_size = payload_size
+        self._index = {}                                    # topic key -> topic id
+        self._topics = []                                   # pre-encoded full topics (bytes)
+        self._ids = array('H', [0] * size)                  # topic id per queued message
+        self._lengths = array('H', [0] * size)              # payload length per queued message
+        self._buffers = [bytearray(payload_size) for _ in range(size)]
+        self._views = [memoryview(buff) for buff in self._buffers]
+        self._head = 0
+        self._count = 0
+        self.sent = 0
+        self.dropped = 0
+        self.high_water = 0
+        self.retired = False                                # Replaced by a reconfigured lane
+        self._ready = asyncio.Event()
+
+    def depth(self):
+        return self._count
+
+    def topic_id(self, key):
+        """
+        :param key: topic lookup key (e.g. short topic)
+        :return: topic id or None (not registered)
+        """
+        return self._index.get(key)
+
+    def register(self, key, full_topic):
+        """
+        Register topic (encoded once)
+        :param key: topic lookup key (e.g. short topic)
+        :param full_topic: full publish topic
+        :return: topic id
+        """
+        tid = self._index.get(key)
+        if tid is None:
+            tid = len(self._topics)
+            self._topics.append(full_topic.encode())
+            self._index[key] = tid
+        return tid
+
+    def _slot(self, tid):
+        """:return: free slot index (reserved) or None if full"""
+        if self._count >= self.size:
+            self.dropped += 1
+            return None
+        slot = (self._head + self._count) % self.size
+        self._ids[slot] = tid
+        return slot
+
+    def _commit(self, slot, length):
+        self._lengths[slot] = length
+        self._count += 1
+        if self._count > self.high_water:
+            self.high_water = self._count
+        self._ready.set()
+
+    def put(self, tid, payload):
+        """
+        Enqueue payload (copied into the preallocated slot buffer)
+        :param tid: topic id
+        :param payload: bytes / bytearray
+        :return: True if queued, False if dropped
+        """
+        length = len(payload)
+        if length > self.payload_size:
+            self.dropped += 1
+            return False
+        slot = self._slot(tid)
+        if slot is None:
+            return False
+        self._buffers[slot][0:length] = payload
+        self._commit(slot, length)
+        return True
+
+    def put_number(self, tid, value, decimals=2):
+        """
+        Enqueue number as ASCII text, digits are written directly into the slot buffer
+        :param tid: topic id
+        :param value: int or float
+        :param decimals: fraction digits (float values), rounded
+        :return: True if queued, False if dropped
+        """
+        slot = self._slot(tid)
+        if slot is None:
+            return False
+        length = _write_number(self._buffers[slot], value, decimals)
+        if length < 0:
+            self.dropped += 1
+            return False
+        self._commit(slot, length)
+        return True
+
+    def peek(self):
+        """
+        Oldest message, the slot stays reserved until release()
+        :return: (topic bytes, payload memoryview) or None
+        """
+        if self._count == 0:
+            return None
+        head = self._head
+        return self._topics[self._ids[head]], self._views[head][0:self._lengths[head]]
+
+    def release(self, sent=True):
+        """Free the oldest slot after publish"""
+        self._head = (self._head + 1) % self.size
+        self._count -= 1
+        if sent:
+            self.sent += 1
+        else:
+            self.dropped += 1
+        if self._count == 0:
+            self._ready.clear()
+
+    def retire(self):
+        """Release the sender waiting on this lane (lane is replaced)"""
+        self.retired = True
+        self._ready.set()
+
+    async def wait(self):
+        """Wait for queued messages OR retirement"""
+        while self._count == 0 and not self.retired:
+            await self._ready.wait()
+
+    def status(self):
+        return {"topics": len(self._topics), "depth": self._count, "size": self.size,
+                "sent": self.sent, "dropped": self.dropped, "high_water": self.high_water}
+
+
+def _write_number(buff, value, decimals):
+    """
+    Write number as ASCII text into a buffer
+    :return: written length, -1 if the buffer is too small
+    """
+    if isinstance(value, float):
+        scale = 10 ** decimals
+        value = int(value * scale + (0.5 if value >= 0 else -0.5))
+    else:
+        decimals = 0
+    size = len(buff)
+    pos = 0
+    if value < 0:
+        if size < 1:
+            return -1
+        buff[0] = 45            # '-'
+        pos = 1
+        value = -value
+    # Count digits (at least decimals + 1 to have the leading zero)
+    digits, rest = 1, value
+    while rest >= 10:
+        rest //= 10
+        digits += 1
+    if digits <= decimals:
+        digits = decimals + 1
+    length = pos + digits + (1 if decimals else 0)
+    if length > size:
+        return -1
+    end = length - 1
+    for i in range(digits):
+        if decimals and i == decimals:
+            buff[end] = 46      # '.'
+            end -= 1
+        buff[end] = 48 + value % 10
+        value //= 10
+        end -= 1
+    return length
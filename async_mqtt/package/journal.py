@@ -0,0 +1,110 @@
+"""
+Store-and-forward journal on flash
+    - compact append-only record file (one JSON line per message)
+    - record: [topic, message, flags] flags: bit0 retain, bit1 binary message (base64)
+    - size-capped: new messages are dropped when full
+    - replay by offset, compaction after acknowledgement
+"""
+
+import json
+from binascii import b2a_base64, a2b_base64
+from os import stat, remove, rename
+
+RETAIN = 1
+BINARY = 2
+
+
+class Journal:
+
+    def __init__(self, path, max_size=8192):
+        """
+        :param path: journal file path
+        :param max_size: max journal file size in bytes
+        """
+        self.path = path
+        self.max_size = max_size
+        try:
+            self.size = stat(path)[6]       # Stored bytes (leftover from previous run)
+        except OSError:
+            self.size = 0
+        self.stored = 0                     # Stored message counter
+        self.replayed = 0                   # Replayed (acknowledged) message counter
+        self.dropped = 0                    # Dropped message counter (journal full)
+
+    def append(self, topic, message, retain=False):
+        """
+        Store message at the end of the journal
+        :return: True if stored, False if dropped (journal full)
+        """
+        flags = RETAIN if retain else 0
+        if isinstance(message, (bytes, bytearray, memoryview)):
+            # Binary (packed) payload: not JSON serialisable
+            message = b2a_base64(message).decode().strip()
+            flags |= BINARY
+        line = (json.dumps((topic, message, flags)) + "\n").encode()
+        if self.size + len(line) > self.max_size:
+            self.dropped += 1
+            return False
+        with open(self.path, 'ab') as f:
+            f.write(line)
+        self.size += len(line)
+        self.stored += 1
+        return True
+
+    def read(self, offset):
+        """
+        Read one record from offset
+        :param offset: record start offset in the journal file
+        :return: (topic, message, retain, next_offset) or None at the end of the journal
+        """
+        if offset >= self.size:
+            return None
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            while True:
+                line = f.readline()
+                if not line:
+                    return None
+                offset += len(line)
+                try:
+                    topic, message, flags = json.loads(line)
+                    if flags & BINARY:
+                        message = a2b_base64(message)
+                except (ValueError, TypeError, KeyError):
+                    # Skip corrupted (partially written OR malformed) record
+                    continue
+                return topic, message, flags & RETAIN == RETAIN, offset
+
+    def compact(self, offset):
+        """
+        Drop acknowledged records before offset
+        :param offset: first not acknowledged record offset
+        """
+        if offset <= 0:
+            return
+        if offset >= self.size:
+            self.clear()
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(self.path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            src.seek(offset)
+            while True:
+                chunk = src.read(256)
+                if not chunk:
+                    break
+                dst.write(chunk)
+        remove(self.path)
+        rename(tmp_path, self.path)
+        self.size -= offset
+
+    def clear(self):
+        """Remove journal file"""
+        try:
+            remove(self.path)
+        except OSError:
+            pass
+        self.size = 0
+
+    def status(self):
+        return {"size": self.size, "max_size": self.max_size, "stored": self.stored,
+                "replayed": self.replayed, "dropped": self.dropped}
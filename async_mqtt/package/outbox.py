@@ -0,0 +1,156 @@
+"""
+Bounded outbound message ring buffer
+    - preallocated slots, O(1) put/pop
+    - overflow policies (sync put): drop oldest, drop newest
+    - async producers (push) wait for a free slot, they are never dropped
+    - on_drop callback receives the dropped messages (e.g. store-and-forward journal)
+Designed for the single MQTT publisher task
+"""
+
+import asyncio
+from utime import ticks_ms
+
+DROP_OLDEST = 'oldest'
+DROP_NEWEST = 'newest'
+POLICIES = (DROP_OLDEST, DROP_NEWEST)
+
+
+class Outbox:
+
+    def __init__(self, size=16, policy=DROP_OLDEST):
+        """
+        :param size: max number of queued messages (preallocated)
+        :param policy: overflow policy of put: oldest / newest
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown outbox policy: {policy} {POLICIES}")
+        self.size = size
+        self.policy = policy
+        self._topics = [None] * size
+        self._messages = [None] * size
+        self._retain = bytearray(size)
+        self._stamps = [0] * size           # Enqueue timestamps (ticks_ms)
+        self._head = 0                      # Next slot to read
+        self._count = 0                     # Number of queued messages
+        self.dropped = 0                    # Dropped message counter (overflow)
+        self.high_water = 0                 # Max queue depth seen
+        self.on_drop = None                 # Callback(topic, message, retain) of dropped messages
+        self._ready = asyncio.Event()       # Set when queue has data
+        self._space = asyncio.Event()       # Set when queue has free slot (push)
+        self._space.set()
+
+    def depth(self):
+        return self._count
+
+    def resize(self, size, policy=None):
+        """
+        Reallocate slots in place (queued messages are kept, waiters stay bound)
+        - shrink: the oldest messages over the new size are dropped
+        :param size: new max number of queued messages
+        :param policy: new overflow policy of put, None: keep current
+        """
+        policy = self.policy if policy is None else policy
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown outbox policy: {policy} {POLICIES}")
+        if size < 1:
+            raise ValueError(f"Invalid outbox size: {size}")
+        self.policy = policy
+        if size == self.size:
+            return
+        # Skip the oldest messages that do not fit
+        skip = self._count - size if self._count > size else 0
+        self.dropped += skip
+        if self.on_drop is not None:
+            for i in range(skip):
+                slot = (self._head + i) % self.size
+                self.on_drop(self._topics[slot], self._messages[slot], self._retain[slot] == 1)
+        count = self._count - skip
+        topics, messages, retain, stamps = [None] * size, [None] * size, bytearray(size), [0] * size
+        for i in range(count):
+            slot = (self._head + skip + i) % self.size
+            topics[i] = self._topics[slot]
+            messages[i] = self._messages[slot]
+            retain[i] = self._retain[slot]
+            stamps[i] = self._stamps[slot]
+        self._topics, self._messages, self._retain, self._stamps = topics, messages, retain, stamps
+        self.size = size
+        self._head = 0
+        self._count = count
+        if count < size:
+            self._space.set()
+        else:
+            self._space.clear()
+
+    def put(self, topic, message, retain=False):
+        """
+        Enqueue message without waiting (overflow policy)
+        :return: True if queued, False if dropped
+        """
+        if self._count >= self.size:
+            if self.policy == DROP_OLDEST:
+                # Overwrite the oldest slot
+                head = self._head
+                if self.on_drop is not None:
+                    self.on_drop(self._topics[head], self._messages[head], self._retain[head] == 1)
+                self._head = (head + 1) % self.size
+                self._count -= 1
+            else:
+                # DROP_NEWEST rejects the new message
+                self.dropped += 1
+                if self.on_drop is not None:
+                    self.on_drop(topic, message, retain)
+                return False
+            self.dropped += 1
+        tail = (self._head + self._count) % self.size
+        self._topics[tail] = topic
+        self._messages[tail] = message
+        self._retain[tail] = 1 if retain else 0
+        self._stamps[tail] = ticks_ms()
+        self._count += 1
+        if self._count > self.high_water:
+            self.high_water = self._count
+        if self._count >= self.size:
+            self._space.clear()
+        self._ready.set()
+        return True
+
+    async def push(self, topic, message, retain=False):
+        """
+        Enqueue message, wait for free slot (async producers are not dropped)
+        :return: True if queued
+        """
+        while self._count >= self.size:
+            await self._space.wait()
+        return self.put(topic, message, retain)
+
+    def pop(self):
+        """
+        Dequeue the oldest message without waiting
+        :return: (topic, message, retain, enqueue_ms) or None
+        """
+        if self._count == 0:
+            return None
+        head = self._head
+        item = self._topics[head], self._messages[head], self._retain[head] == 1, self._stamps[head]
+        # Release references for gc
+        self._topics[head] = None
+        self._messages[head] = None
+        self._head = (head + 1) % self.size
+        self._count -= 1
+        if self._count == 0:
+            self._ready.clear()
+        self._space.set()
+        return item
+
+    async def get(self):
+        """
+        Dequeue the oldest message, wait for data if empty
+        :return: (topic, message, retain, enqueue_ms)
+        """
+        while self._count == 0:
+            await self._ready.wait()
+        return self.pop()
+
+    def status(self):
+        return {"depth": self._count, "size": self.size, "policy": self.policy,
+                "dropped": self.dropped, "high_water": self.high_water}
@@ -0,0 +1,91 @@
+"""
+Token bucket rate limiting for inbound MQTT messages
+    - global bucket + per topic prefix buckets
+    - O(1) token refill on check (no timer task)
+"""
+
+from utime import ticks_ms, ticks_diff
+
+
+class TokenBucket:
+
+    def __init__(self, rate, burst):
+        """
+        :param rate: token refill rate (messages per second)
+        :param burst: bucket size (max burst of messages)
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.dropped = 0
+        self._last = ticks_ms()
+
+    def take(self):
+        """
+        Take one token
+        :return: True if allowed, False if the bucket is empty
+        """
+        now = ticks_ms()
+        elapsed = ticks_diff(now, self._last)
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate / 1000)
+            self._last = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        self.dropped += 1
+        return False
+
+    def status(self):
+        return {"rate": self.rate, "burst": self.burst, "dropped": self.dropped}
+
+
+class RateLimiter:
+
+    def __init__(self):
+        self.bucket = None              # Global token bucket
+        self.prefixes = []              # [(topic prefix, TokenBucket), ...]
+
+    def set(self, rate, burst, prefix=None):
+        """
+        Set (rate > 0) or remove (rate <= 0) token bucket
+        :param rate: messages per second
+        :param burst: max burst of messages
+        :param prefix: topic prefix, None: global bucket
+        """
+        bucket = TokenBucket(rate, burst) if rate > 0 else None
+        if prefix is None:
+            self.bucket = bucket
+            return
+        self.prefixes = [p for p in self.prefixes if p[0] != prefix]
+        if bucket is not None:
+            # Longest prefix first: most specific bucket wins
+            self.prefixes.append((prefix, bucket))
+            self.prefixes.sort(key=lambda p: len(p[0]), reverse=True)
+
+    def allow(self, topic):
+        """
+        Check inbound message
+        :param topic: decoded topic string
+        :return: True if allowed, False if the message should be shed
+        """
+        prefix_bucket = None
+        for prefix, bucket in self.prefixes:
+            if topic.startswith(prefix):
+                if not bucket.take():
+                    return False
+                prefix_bucket = bucket
+                break
+        if self.bucket is not None and not self.bucket.take():
+            if prefix_bucket is not None:
+                # Refund: message was not accepted
+                prefix_bucket.tokens += 1
+            return False
+        return True
+
+    def active(self):
+        return self.bucket is not None or len(self.prefixes) > 0
+
+    def status(self):
+        return {"global": None if self.bucket is None else self.bucket.status(),
+                "prefixes": {p: b.status() for p, b in self.prefixes}}
@@ -0,0 +1,98 @@
+"""
+Report-by-exception table
+    - remembers the last sent value per topic in compact arrays
+    - publish only when the change exceeds the deadband (larger of absolute and relative)
+    - forced heartbeat after max silence interval
+"""
+
+from array import array
+from utime import ticks_ms, ticks_diff
+
+
+def fmt(value):
+    """
+    Published text of a reported value - same format for reports and heartbeats
+    Values are stored as float32 in the table: 7 significant digits
+    """
+    return f"{value:.7g}"
+
+
+class DeadbandTable:
+
+    def __init__(self, size=64):
+        """
+        :param size: max number of points (preallocated)
+        """
+        self.size = size
+        self._index = {}                        # topic -> slot
+        self._topics = [None] * size
+        self._last = array('f', [0] * size)     # Last sent value
+        self._abs = array('f', [0] * size)      # Absolute deadband
+        self._rel = array('f', [0] * size)      # Relative deadband (ratio of last value)
+        self._stamp = array('i', [0] * size)    # Last send time (ticks_ms)
+        self._heartbeat = array('i', [0] * size)  # Max silence interval in ms (0: no heartbeat)
+        self._retain = bytearray(size)
+        self.sent = 0                           # Published values
+        self.suppressed = 0                     # Suppressed values (within deadband)
+        self.untracked = 0                      # Values without deadband check (no free slot), published
+
+    def __len__(self):
+        return len(self._index)
+
+    def report(self, topic, value, absolute=0, relative=0, heartbeat_ms=60000, retain=False):
+        """
+        Check value against the topic deadband
+        - deadband parameters are stored when the topic is registered (first report)
+        :param topic: full topic
+        :param value: numeric value
+        :param absolute: absolute deadband
+        :param relative: relative deadband (0.05: 5% of the last sent value)
+        :param heartbeat_ms: publish after max silence interval (0: no heartbeat)
+        :param retain: retain flag for publishing
+        :return: True if the value has to be published (table is updated)
+        """
+        slot = self._index.get(topic)
+        if slot is None:
+            if len(self._index) >= self.size:
+                # Table is full: publish without deadband (no suppression, no heartbeat)
+                self.untracked += 1
+                self.sent += 1
+                return True
+            slot = len(self._index)
+            self._index[topic] = slot
+            self._topics[slot] = topic
+            self._abs[slot] = absolute
+            self._rel[slot] = relative
+            self._heartbeat[slot] = heartbeat_ms
+            self._retain[slot] = 1 if retain else 0
+        else:
+            last = self._last[slot]
+            if abs(value - last) <= max(self._abs[slot], self._rel[slot] * abs(last)) and not self._silent(slot, ticks_ms()):
+                self.suppressed += 1
+                return False
+        self._last[slot] = value
+        self._stamp[slot] = ticks_ms()
+        self.sent += 1
+        return True
+
+    def _silent(self, slot, now):
+        heartbeat = self._heartbeat[slot]
+        return heartbeat > 0 and ticks_diff(now, self._stamp[slot]) >= heartbeat
+
+    def heartbeats(self):
+        """
+        Collect points over max silence interval (table is updated)
+        :return: list of (topic, last value, retain)
+        """
+        now = ticks_ms()
+        out = []
+        for slot in range(len(self._index)):
+            if self._silent(slot, now):
+                self._stamp[slot] = now
+                self.sent += 1
+                out.append((self._topics[slot], self._last[slot], self._retain[slot] == 1))
+        return out
+
+    def status(self):
+        return {"points": len(self._index), "size": self.size, "sent": self.sent,
+                "suppressed": self.suppressed, "untracked": self.untracked}
@@ -0,0 +1,154 @@
+"""
+MQTT topic router
+    - topic filters with + and # wildcards
+    - compiled into a trie: matching is O(topic depth)
+    - tracks the topic filters to subscribe (with QoS)
+"""
+
+SINGLE = '+'
+MULTI = '#'
+
+
+class Node:
+
+    def __init__(self):
+        self.children = {}              # Topic level -> Node
+        self.handlers = []              # Registered callbacks on this level
+
+
+class Router:
+
+    def __init__(self):
+        self._root = Node()
+        self.filters = {}               # Subscription registry: topic filter -> qos
+
+    @staticmethod
+    def validate(topic_filter:str):
+        """
+        Validate MQTT topic filter
+        :return: list of topic levels
+        """
+        levels = topic_filter.split('/')
+        for i, level in enumerate(levels):
+            if MULTI in level and (level != MULTI or i != len(levels) - 1):
+                raise ValueError(f"Invalid topic filter: {topic_filter} (# must be the last level)")
+            if SINGLE in level and level != SINGLE:
+                raise ValueError(f"Invalid topic filter: {topic_filter} (+ must occupy an entire level)")
+        return levels
+
+    def add(self, topic_filter:str, handler, qos=None):
+        """
+        Register topic filter handler
+        :param topic_filter: MQTT topic filter, e.g. fleet/+/temp or fleet/#
+        :param handler: callback(topic:str, msg:str, retained:bool), can be async
+        :param qos: subscription QoS (None: client default)
+        """
+        node = self._root
+        for level in self.validate(topic_filter):
+            child = node.children.get(level)
+            if child is None:
+                child = Node()
+                node.children[level] = child
+            node = child
+        if handler not in node.handlers:
+            node.handlers.append(handler)
+        self.filters[topic_filter] = qos
+
+    def remove(self, topic_filter:str, handler=None):
+        """
+        Remove topic filter handler(s)
+        :param topic_filter: MQTT topic filter
+        :param handler: callback to remove, None: remove all handlers of the filter
+        :return: True if the filter has no more handlers (can be unsubscribed)
+        """
+        path = [self._root]
+        for level in topic_filter.split('/'):
+            node = path[-1].children.get(level)
+            if node is None:
+                return False
+            path.append(node)
+        node = path[-1]
+        if handler is None:
+            node.handlers.clear()
+        elif handler in node.handlers:
+            node.handlers.remove(handler)
+        if node.handlers:
+            return False
+        self.filters.pop(topic_filter, None)
+        # Prune empty branches
+        levels = topic_filter.split('/')
+        for i in range(len(levels), 0, -1):
+            node = path[i]
+            if node.handlers or node.children:
+                break
+            path[i - 1].children.pop(levels[i - 1])
+        return True
+
+    @staticmethod
+    def covers(general:str, specific:str):
+        """
+        Check topic filter coverage
+        :return: True if every topic matched by specific is matched by general
+        """
+        if general == specific:
+            return True
+        gen, spec = general.split('/'), specific.split('/')
+        if spec[0].startswith('$') and gen[0] in (SINGLE, MULTI):
+            # Topics starting with $ are not matched by leading wildcards (MQTT spec)
+            return False
+        for i, level in enumerate(gen):
+            if level == MULTI:
+                return True
+            if i >= len(spec) or spec[i] == MULTI:
+                return False
+            if level != SINGLE and level != spec[i]:
+                return False
+        return len(gen) == len(spec)
+
+    def minimal(self, default_qos=0):
+        """
+        Minimal subscription set: drop filters covered by another filter with the same or higher QoS
+        - less SUBSCRIBE round trips and no duplicated deliveries from overlapping subscriptions
+        :param default_qos: QoS for filters registered without QoS
+        :return: {topic_filter: qos}
+        """
+        resolved = {f: (default_qos if q is None else q) for f, q in self.filters.items()}
+        out = {}
+        for topic_filter, qos in resolved.items():
+            covered = False
+            for other, other_qos in resolved.items():
+                if other != topic_filter and other_qos >= qos and self.covers(other, topic_filter):
+                    covered = True
+                    break
+            if not covered:
+                out[topic_filter] = qos
+        return out
+
+    def match(self, levels:list):
+        """
+        Collect handlers for a topic
+        :param levels: topic levels (topic split by / once)
+        :return: list of matching handlers
+        """
+        out = []
+        # Topics starting with $ are not matched by leading wildcards (MQTT spec)
+        self._match(self._root, levels, 0, out, levels[0].startswith('$'))
+        return out
+
+    def _match(self, node, levels, index, out, system):
+        children = node.children
+        if not system:
+            multi = children.get(MULTI)
+            if multi is not None:
+                # parent/# matches parent and all of its sub-levels
+                out.extend(multi.handlers)
+        if index == len(levels):
+            out.extend(node.handlers)
+            return
+        child = children.get(levels[index])
+        if child is not None:
+            self._match(child, levels, index + 1, out, False)
+        if not system:
+            single = children.get(SINGLE)
+            if single is not None:
+                self._match(single, levels, index + 1, out, False)
@@ -0,0 +1,101 @@
+"""
+Device-state shadow
+    - load modules register state providers (callable or "module.function" of a loaded LM)
+    - the last published document is kept, changes are emitted as JSON merge patches (RFC 7396)
+    - version counter "_v" in every patch / snapshot (missed patch -> request snapshot)
+"""
+
+from sys import modules
+
+
+def merge_patch(old, new):
+    """
+    JSON merge patch from old to new document
+    - changed and added keys with the new value, removed keys with None
+    :return: patch dict (empty: no change) OR new value (not dict documents)
+    """
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return {} if old == new else new
+    patch = {}
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            sub = merge_patch(old[key], value)
+            if sub:
+                patch[key] = sub
+        elif old[key] != value:
+            patch[key] = value
+    for key in old:
+        if key not in new:
+            patch[key] = None
+    return patch
+
+
+class Shadow:
+
+    def __init__(self):
+        self.providers = {}         # name -> callable OR "module.function"
+        self.state = {}             # Last published document
+        self.version = 0
+        self.errors = 0             # Provider call errors
+
+    def add(self, name, provider):
+        """
+        Register state provider
+        :param name: top level document key
+        :param provider: callable without arguments OR "module.function" (loaded LM_module)
+        """
+        self.providers[name] = provider
+
+    def remove(self, name):
+        """Remove state provider (key is removed by the next patch)"""
+        self.providers.pop(name, None)
+
+    def _call(self, provider):
+        if isinstance(provider, str):
+            module, function = provider.split('.', 1)
+            lm = modules.get(f"LM_{module}")
+            if lm is None:
+                raise ValueError(f"LM_{module} is not loaded")
+            provider = getattr(lm, function)
+        return provider()
+
+    def collect(self):
+        """
+        Call the state providers
+        - failed provider: last published value is kept
+        :return: current document
+        """
+        doc = {}
+        for name, provider in self.providers.items():
+            try:
+                doc[name] = self._call(provider)
+            except Exception:
+                self.errors += 1
+                if name in self.state:
+                    doc[name] = self.state[name]
+        return doc
+
+    def update(self):
+        """
+        Collect state and diff against the last published document
+        :return: merge patch with "_v" OR None (no change)
+        """
+        doc = self.collect()
+        patch = merge_patch(self.state, doc)
+        if not patch:
+            return None
+        self.state = doc
+        self.version += 1
+        patch["_v"] = self.version
+        return patch
+
+    def snapshot(self):
+        """:return: full last published document with "_v" """
+        doc = dict(self.state)
+        doc["_v"] = self.version
+        return doc
+
+    def status(self):
+        return {"providers": list(self.providers), "version": self.version, "errors": self.errors}
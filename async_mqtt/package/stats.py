@@ -0,0 +1,76 @@
+"""
+MQTT client instrumentation
+    - counters and latency histograms in fixed-size 64-bit integer arrays (no overflow / wrap of byte and ms sums)
+    - O(1) recording on the hot path (no allocation while the values fit into a small int)
+"""
+
+from array import array
+
+# Counter indexes
+MSG_IN = 0
+BYTES_IN = 1
+MSG_OUT = 2
+BYTES_OUT = 3
+PUB_ERRORS = 4
+RECONNECTS = 5
+RECONNECT_MS = 6            # Last reconnect duration (down -> up)
+COUNTERS = ("msg_in", "bytes_in", "msg_out", "bytes_out", "pub_errors", "reconnects", "reconnect_ms")
+
+# Latency histogram bucket upper bounds in ms (+ overflow bucket)
+BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class Histogram:
+
+    def __init__(self, bounds=BOUNDS):
+        """
+        :param bounds: bucket upper bounds in ms (ascending)
+        """
+        self.bounds = bounds
+        self.buckets = array('Q', [0] * (len(bounds) + 1))
+        self.totals = array('Q', [0, 0, 0])        # count, sum ms, max ms
+
+    def add(self, ms):
+        """Record latency in ms"""
+        index = 0
+        for bound in self.bounds:
+            if ms <= bound:
+                break
+            index += 1
+        self.buckets[index] += 1
+        totals = self.totals
+        totals[0] += 1
+        totals[1] += ms
+        if ms > totals[2]:
+            totals[2] = ms
+
+    def reset(self):
+        for i in range(len(self.buckets)):
+            self.buckets[i] = 0
+        for i in range(3):
+            self.totals[i] = 0
+
+    def status(self):
+        count, total, peak = self.totals
+        return {"le_ms": self.bounds, "counts": list(self.buckets), "count": count,
+                "mean_ms": total // count if count else 0, "max_ms": peak}
+
+
+class Stats:
+
+    def __init__(self):
+        self.counters = array('Q', [0] * len(COUNTERS))
+        self.execute = Histogram()              # Command execution latency
+        self.publish = Histogram()              # Publish latency (enqueue -> sent)
+
+    def reset(self):
+        for i in range(len(self.counters)):
+            self.counters[i] = 0
+        self.execute.reset()
+        self.publish.reset()
+
+    def status(self):
+        status = {name: self.counters[i] for i, name in enumerate(COUNTERS)}
+        status["execute"] = self.execute.status()
+        status["publish"] = self.publish.status()
+        return status
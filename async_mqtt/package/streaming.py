@@ -0,0 +1,63 @@
+"""
+Incremental JSON encoding for chunked responses
+    - iterencode: JSON pieces generated from the object tree (no full string in memory)
+    - chunks: fixed size frames from the pieces, peak memory bounded by the chunk size
+"""
+
+import json
+
+
+def iterencode(obj):
+    """
+    Generate JSON string pieces of an object
+    :param obj: JSON serialisable object (dict, list, tuple, str, number, bool, None)
+    """
+    if isinstance(obj, dict):
+        yield '{'
+        first = True
+        for key, value in obj.items():
+            if not first:
+                yield ', '
+            first = False
+            yield json.dumps(key if isinstance(key, str) else str(key))
+            yield ': '
+            yield from iterencode(value)
+        yield '}'
+    elif isinstance(obj, (list, tuple)):
+        yield '['
+        first = True
+        for value in obj:
+            if not first:
+                yield ', '
+            first = False
+            yield from iterencode(value)
+        yield ']'
+    else:
+        yield json.dumps(obj)
+
+
+def chunks(obj, size, serialised=False):
+    """
+    Generate fixed size JSON frames
+    :param obj: object to encode OR encoded str / bytes (serialised=True)
+    :param size: max frame size (characters)
+    :param serialised: obj is already encoded (frames are slices)
+    """
+    if size <= 0:
+        raise ValueError(f"Invalid chunk size: {size}")
+    if serialised:
+        for start in range(0, len(obj), size):
+            yield obj[start:start + size]
+        return
+    buffer, length = [], 0
+    for piece in iterencode(obj):
+        while piece:
+            part = piece[:size - length]
+            piece = piece[len(part):]
+            buffer.append(part)
+            length += len(part)
+            if length >= size:
+                yield ''.join(buffer)
+                buffer, length = [], 0
+    if buffer:
+        yield ''.join(buffer)
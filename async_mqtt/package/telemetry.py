@@ -0,0 +1,78 @@
+"""
+Windowed telemetry aggregator
+    - samples are pushed by metric name in O(1)
+    - min, max, mean, count and last value per metric in preallocated arrays
+    - one compact JSON document per window
+"""
+
+import json
+from array import array
+
+
+class Aggregator:
+
+    def __init__(self, size=16, window_ms=10000):
+        """
+        :param size: max number of metrics (preallocated)
+        :param window_ms: aggregation window in milliseconds
+        """
+        self.size = size
+        self.window_ms = window_ms
+        self._index = {}                            # metric name -> slot
+        self._names = [None] * size                 # JSON encoded metric names
+        self._min = array('f', [0] * size)
+        self._max = array('f', [0] * size)
+        self._sum = array('f', [0] * size)
+        self._last = array('f', [0] * size)
+        self._count = array('I', [0] * size)
+        self.windows = 0                            # Published window counter
+        self.dropped = 0                            # Dropped samples (unknown metric, no free slot)
+
+    def sample(self, name, value):
+        """
+        Add sample to the current window
+        :param name: metric name
+        :param value: numeric sample value
+        :return: True if recorded, False if dropped
+        """
+        slot = self._index.get(name)
+        if slot is None:
+            if len(self._index) >= self.size:
+                self.dropped += 1
+                return False
+            slot = len(self._index)
+            self._index[name] = slot
+            self._names[slot] = json.dumps(name)
+        if self._count[slot] == 0:
+            self._min[slot] = self._max[slot] = self._sum[slot] = value
+        else:
+            if value < self._min[slot]:
+                self._min[slot] = value
+            elif value > self._max[slot]:
+                self._max[slot] = value
+            self._sum[slot] += value
+        self._last[slot] = value
+        self._count[slot] += 1
+        return True
+
+    def flush(self):
+        """
+        Close the current window
+        :return: JSON document {"w": window_ms, "m": {name: [min, max, mean, count, last]}} or None (no samples)
+        """
+        parts = []
+        for slot in range(len(self._index)):
+            count = self._count[slot]
+            if count == 0:
+                continue
+            mean = self._sum[slot] / count
+            parts.append(f'{self._names[slot]}: [{round(self._min[slot], 3)}, {round(self._max[slot], 3)}, {round(mean, 3)}, {count}, {round(self._last[slot], 3)}]')
+            self._count[slot] = 0
+        if not parts:
+            return None
+        self.windows += 1
+        return f'{{"w": {self.window_ms}, "m": {{{", ".join(parts)}}}}}'
+
+    def status(self):
+        return {"metrics": len(self._index), "size": self.size, "window_ms": self.window_ms,
+                "windows": self.windows, "dropped": self.dropped}
@@ -0,0 +1,59 @@
+"""
+Host side unit tests of the MQTT topic router (CPython)
+    python3 -m unittest discover -s async_mqtt/tests
+"""
+
+import unittest
+from importlib.util import spec_from_file_location, module_from_spec
+from pathlib import Path
+
+_spec = spec_from_file_location("router", Path(__file__).parent.parent / "package" / "router.py")
+router = module_from_spec(_spec)
+_spec.loader.exec_module(router)
+Router = router.Router
+
+
+class TestCovers(unittest.TestCase):
+
+    def test_wildcards(self):
+        self.assertTrue(Router.covers("#", "a/b"))
+        self.assertTrue(Router.covers("a/#", "a/+/c"))
+        self.assertTrue(Router.covers("a/+/c", "a/b/c"))
+        self.assertFalse(Router.covers("a/+", "a/#"))
+        self.assertFalse(Router.covers("a/b", "a/b/c"))
+
+    def test_system_topics(self):
+        # Leading wildcards do not match $ topics (MQTT spec)
+        self.assertFalse(Router.covers("#", "$SYS/broker/#"))
+        self.assertFalse(Router.covers("+/broker/#", "$SYS/broker/#"))
+        self.assertTrue(Router.covers("$SYS/#", "$SYS/broker/#"))
+
+
+class TestMinimal(unittest.TestCase):
+
+    def test_keeps_system_filter(self):
+        r = Router()
+        for topic_filter in ("#", "$SYS/broker/#"):
+            r.add(topic_filter, print)
+        self.assertEqual(r.minimal(), {"#": 0, "$SYS/broker/#": 0})
+
+    def test_drops_covered_filter(self):
+        r = Router()
+        r.add("dev/#", print, qos=1)
+        r.add("dev/+/temp", print, qos=0)
+        r.add("dev/a/temp", print, qos=2)
+        self.assertEqual(r.minimal(), {"dev/#": 1, "dev/a/temp": 2})
+
+
+class TestMatch(unittest.TestCase):
+
+    def test_system_topic_match(self):
+        r = Router()
+        r.add("#", "all")
+        r.add("$SYS/broker/#", "sys")
+        self.assertEqual(r.match("$SYS/broker/load".split('/')), ["sys"])
+        self.assertEqual(r.match("dev/a".split('/')), ["all"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,15 +7,17 @@ Designed by Marcell Ban aka BxNxM
 from async_oledui.uiframes import (Frame, Cursor, AppFrame,
                                    HeaderBarFrames, PageBarFrame, PopUpFrame,
                                    ScreenSaver, debugging)
+from async_oledui.compositor import Compositor
+from async_oledui.scheduler import Scheduler
+from async_oledui.metrics import Metrics
+from async_oledui import metrics
 from async_oledui import peripheries as periph
 
 from utime import ticks_ms, ticks_diff, sleep_ms
 from Common import syslog, micro_task, manage_task, exec_cmd
 from Types import resolve
-# Core modules
-from Config import cfgget
 # Load Modules
-from LM_system import ifconfig, hosts
+from LM_system import hosts
 
 
 #################################################################################
@@ -28,7 +30,8 @@ class PageUI:
     DISPLAY = None
     HAPTIC = None
 
-    def __init__(self, w=128, h=64, page=0, poweroff=None, oled_type='ssd1306', control=None, haptic=False):
+    def __init__(self, w=128, h=64, page=0, poweroff=None, oled_type='ssd1306', control=None, haptic=False,
+                 metrics_ms=2000):
         """
         :param w: screen width
         :param h: screen height
@@ -36,6 +39,7 @@ class PageUI:
         :param poweroff: power off after given seconds
         :param oled_type: ssd1306 or sh1106
         :param control: trackball / None
+        :param metrics_ms: system metrics sampling period (widget cache)
         """
         # OLED setup
         if oled_type.strip() in ('ssd1306', 'sh1106'):
@@ -54,9 +58,13 @@ class PageUI:
         self.height = h-1           # 64 -> 0-63: Good for xy calculation, but absolut width+1 needed!
         self.page = page
         self.timer = poweroff
+        self.metrics = Metrics(ttl_ms=metrics_ms)
         self._last_page_switch = ticks_ms()
         self._cmd_task_tag = None
+        self._oled_type = oled_type.strip()
         # Store persistent frame objects
+        self.compositor = None
+        self.scheduler = None
         self.cursor = None
         self.header_bar = None
         self.app_frame = None
@@ -87,6 +95,11 @@ class PageUI:
 
     def create(self):
         self._boot_msg()
+        # Display flush: dirty regions, one flush per scheduler tick
+        self.compositor = Compositor(PageUI.DISPLAY, width=self.width+1, height=self.height+1,
+                                     oled_type=self._oled_type)
+        self.scheduler = Scheduler(self.compositor)
+        self.metrics.run()
         # Create managed frames
         self.cursor = Cursor(PageUI.DISPLAY, width=2, height=2, x=0, y=self.height)
         self.header_bar = HeaderBarFrames(PageUI.DISPLAY, timer=self.timer, cursor_draw=self.cursor.draw)
@@ -111,7 +124,7 @@ class PageUI:
             self.cursor.update(x, y)
             lut = {"right": "next", "left": "prev"}           # Convert trackball output to control command
             self.control(lut.get(action, action))
-            self.DISPLAY.show()
+            self.compositor.flush()           # Immediate input feedback
 
     def control(self, action, force=False):
         # Wake on action
@@ -153,8 +166,8 @@ class PageUI:
             self.DISPLAY.poweron()
 
     @staticmethod
-    def add_page(page):
-        return AppFrame.add_page(page)
+    def add_page(page, key=None):
+        return AppFrame.add_page(page, key)
 
     @staticmethod
     def write_lines(msg, display, x, y, line_limit=3):
@@ -247,12 +260,16 @@ def _system_page(display, w, h, x, y):
     """
     System basic information page
     """
-    devip = ifconfig()[1][0]
-    display.text(cfgget("devfid"), x, y+5)
+    devip = metrics.get("ifconfig")[1][0]
+    display.text(metrics.cfg("devfid"), x, y+5)
     display.text(f"  {devip}", x, y+15)
-    display.text(f"  V: {cfgget('version')}", x, y+25)
+    display.text(f"  V: {metrics.cfg('version')}", x, y+25)
     return True
 
+def _system_page_key():
+    return metrics.get("ifconfig")[1][0]
+
+
 def _intercon_nodes_page(display, w, h, x, y):
     line_limit = 3
     line_start = y+5
@@ -281,11 +298,15 @@ def _intercon_nodes_page(display, w, h, x, y):
 def _empty_page(display, w, h, x, y):
     pass
 
+
+def _empty_page_key():
+    return True
+
 #################################################################################
 #                                  Public functions                             #
 #################################################################################
 
-def load(width=128, height=64, oled_type="sh1106", control='trackball', poweroff=None, haptic=False):
+def load(width=128, height=64, oled_type="sh1106", control='trackball', poweroff=None, haptic=False, metrics_ms=2000):
     """
     Create async oled UI
     :param width: screen width in pixels
@@ -294,11 +315,15 @@ def load(width=128, height=64, oled_type="sh1106", control='trackball', poweroff
     :param control: trackball / None
     :param poweroff: power off after given seconds
     :param haptic: enable (True) / disable (False) haptic feedbacks (vibration)
+    :param metrics_ms: system metrics (cpu, mem, rssi, ...) sampling period shared by the widgets
     """
     if PageUI.INSTANCE is None:
-        ui = PageUI(width, height, poweroff=poweroff, oled_type=oled_type, control=control, haptic=haptic)
+        ui = PageUI(width, height, poweroff=poweroff, oled_type=oled_type, control=control, haptic=haptic,
+                    metrics_ms=metrics_ms)
         # Add default pages...
-        ui.add_page([_system_page, _intercon_nodes_page, _empty_page])
+        ui.add_page(_system_page, key=_system_page_key)
+        ui.add_page(_intercon_nodes_page)
+        ui.add_page(_empty_page, key=_empty_page_key)
         ui.create()         # Header(4), AppPage(1), PagerIndicator
         return "PageUI was created"
     return "PageUI was already created"
@@ -354,27 +379,43 @@ def genpage(cmd=None, run=False):
     return True
 
 
-def add_page(page_callback):
+def add_page(page_callback, key_callback=None):
     """
     [LM] Create page from load module with callback function
     :param page_callback: callback func(display, w, h, x, y)
+    :param key_callback: optional content key callback func() - page redraw only on key change
     """
-    return AppFrame.add_page(page_callback)
+    return AppFrame.add_page(page_callback, key_callback)
 
 
 def debug(state=None):
    return debugging(state)
 
 
+def stats():
+    """
+    UI render statistics
+    - frames: performed and skipped (unchanged content key) renders
+    - scheduler: draws and wakeups, display: flushes and pushed bytes
+    - metrics: system source queries and cached reads
+    """
+    if PageUI.INSTANCE is None or PageUI.INSTANCE.scheduler is None:
+        return "PageUI was not created"
+    return {"frames": Frame.render_stats(),
+            "scheduler": PageUI.INSTANCE.scheduler.status(),
+            "display": PageUI.INSTANCE.compositor.status(),
+            "metrics": PageUI.INSTANCE.metrics.status()}
+
+
 def help(widgets=False):
     """
     New generation of oled_ui
     - with async frames
     """
     return resolve(
-        ("load width=128 height=64 oled_type='sh1106/ssd1306' control='trackball' poweroff=None/sec haptic=False",
+        ("load width=128 height=64 oled_type='sh1106/ssd1306' control='trackball' poweroff=None/sec haptic=False metrics_ms=2000",
                   "BUTTON control cmd=<prev,press,next,on,off>",
                   "BUTTON debug state=<True,False>", "cursor x y",
                   "popup msg='text'", "cancel_popup",
-                  "genpage cmd='system clock'"),
+                  "genpage cmd='system clock'", "stats"),
         widgets=widgets)
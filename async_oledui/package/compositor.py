@@ -0,0 +1,155 @@
+"""
+Dirty-region display compositor
+    - frames mark their changed rectangles, one display flush per UI tick (Scheduler)
+    - partial push: only the dirty columns of the affected display pages (8 pixel rows)
+        SSD1306: column + page address window (horizontal addressing mode)
+        SH1106: page + column start address (page addressing mode)
+    - unknown drivers (no write_cmd/write_data/buffer): full show() fallback
+"""
+
+import asyncio
+from Common import syslog
+
+SSD1306 = 'ssd1306'
+SH1106 = 'sh1106'
+SH1106_COL_OFFSET = 2           # 132 column controller RAM, 128 px panel is centered
+
+
+class Compositor:
+    INSTANCE = None
+
+    def __init__(self, display, width=128, height=64, oled_type=SH1106, tick_ms=20):
+        """
+        :param display: display load module (LM_oled / LM_oled_sh1106)
+        :param width: screen width in pixels
+        :param height: screen height in pixels
+        :param oled_type: ssd1306 or sh1106 (partial push protocol)
+        :param tick_ms: flush coalescing window after the first dirty mark
+        """
+        self.display = display
+        self.width = width
+        self.height = height
+        self.pages = (height + 7) // 8
+        self.tick_ms = tick_ms
+        # Dirty column span per page: clean if x0 > x1 (preallocated)
+        self._x0 = bytearray(b'\xff' * self.pages)
+        self._x1 = bytearray(self.pages)
+        self._dirty = False
+        self.event = asyncio.Event()        # Set on dirty mark - wakes the UI scheduler
+        # Partial push driver binding
+        self.device = None
+        self._buffer = None
+        self._push = None
+        self._col_offset = (128 - width) // 2 if width < 128 else 0   # ssd1306 narrow panels: centred columns
+        self._bind(oled_type)
+        # Metrics
+        self.flushes = 0                    # Number of flushes
+        self.full = 0                       # Number of full show() flushes
+        self.pushed = 0                     # Pushed framebuffer bytes
+        Compositor.INSTANCE = self
+
+    def _bind(self, oled_type):
+        """Select partial push method based on the display driver capabilities"""
+        try:
+            device = self.display.load()
+        except Exception as e:
+            syslog(f"[WARN] oledui compositor: {e}")
+            return
+        if not (hasattr(device, 'write_cmd') and hasattr(device, 'write_data')):
+            return
+        # sh1106 driver: displaybuf (rendered buffer), ssd1306 driver: buffer
+        buffer = getattr(device, 'displaybuf', None) or getattr(device, 'buffer', None)
+        if buffer is None or len(buffer) < self.width * self.pages or getattr(device, 'rotate90', False):
+            return
+        self.device = device
+        self._buffer = memoryview(buffer)
+        self._push = self._push_sh1106 if oled_type == SH1106 else self._push_ssd1306
+
+    def _push_ssd1306(self, page, x0, x1):
+        cmd = self.device.write_cmd
+        cmd(0x21)                                   # SET_COL_ADDR
+        cmd(x0 + self._col_offset)
+        cmd(x1 + self._col_offset)
+        cmd(0x22)                                   # SET_PAGE_ADDR
+        cmd(page)
+        cmd(page)
+        start = page * self.width
+        self.device.write_data(self._buffer[start + x0:start + x1 + 1])
+
+    def _push_sh1106(self, page, x0, x1):
+        cmd = self.device.write_cmd
+        col = x0 + SH1106_COL_OFFSET
+        cmd(0xB0 | page)                            # SET_PAGE_ADDRESS
+        cmd(col & 0x0F)                             # LOW_COLUMN_ADDRESS
+        cmd(0x10 | (col >> 4))                      # HIGH_COLUMN_ADDRESS
+        start = page * self.width
+        self.device.write_data(self._buffer[start + x0:start + x1 + 1])
+
+    def mark(self, x, y, w, h):
+        """
+        Mark rectangle as dirty and request flush
+        :param x: start x
+        :param y: start y
+        :param w: width (inclusive border, like display.rect)
+        :param h: height
+        """
+        x0 = x if x > 0 else 0
+        x1 = x + w if x + w < self.width else self.width - 1
+        y1 = y + h if y + h < self.height else self.height - 1
+        if x0 > x1 or y1 < 0:
+            return
+        for page in range((y if y > 0 else 0) >> 3, (y1 >> 3) + 1):
+            if x0 < self._x0[page]:
+                self._x0[page] = x0
+            if x1 > self._x1[page]:
+                self._x1[page] = x1
+        self._dirty = True
+        self.event.set()
+
+    def mark_all(self):
+        self.mark(0, 0, self.width, self.height)
+
+    def flush(self):
+        """
+        Push dirty regions to the display
+        - full show() if the driver has no partial push or most of the screen is dirty
+        :return: True if something was pushed
+        """
+        if not self._dirty:
+            return False
+        self._dirty = False
+        x0, x1 = self._x0, self._x1
+        dirty_bytes = 0
+        for page in range(self.pages):
+            if x0[page] <= x1[page]:
+                dirty_bytes += x1[page] - x0[page] + 1
+        full_bytes = self.width * self.pages
+        if self._push is None or dirty_bytes * 4 > full_bytes * 3:
+            self.display.show()
+            self.full += 1
+            dirty_bytes = full_bytes
+        else:
+            for page in range(self.pages):
+                if x0[page] <= x1[page]:
+                    self._push(page, x0[page], x1[page])
+        for page in range(self.pages):
+            x0[page] = 0xff
+            x1[page] = 0
+        self.flushes += 1
+        self.pushed += dirty_bytes
+        return True
+
+    @staticmethod
+    def invalidate(display, x, y, w, h):
+        """
+        Mark area dirty on the active compositor
+        - without compositor: immediate full display show
+        """
+        if Compositor.INSTANCE is None:
+            display.show()
+        else:
+            Compositor.INSTANCE.mark(x, y, w, h)
+
+    def status(self):
+        return {"flushes": self.flushes, "full": self.full, "bytes": self.pushed,
+                "partial": self._push is not None}
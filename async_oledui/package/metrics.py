@@ -0,0 +1,113 @@
+"""
+Shared system metrics provider for the OLED widgets and pages
+    - TTL cache: one background task samples the system sources once per TTL
+    - demand driven: only the sources read since the last sampling are re-sampled,
+      the task is idle (event wait) while nothing reads metrics (e.g. hibernation)
+    - first read OR expired value (2x TTL, idle task): synchronous sample
+Sources: top, memory, cpu_temp, rssi, ifconfig + config keys (cfg)
+"""
+
+import asyncio
+from utime import ticks_ms, ticks_diff
+from Common import micro_task, syslog
+from Config import cfgget
+from LM_system import top, memory_usage, ifconfig, rssi as sta_rssi
+try:
+    from LM_esp32 import temp as cpu_temp
+except Exception as e:
+    cpu_temp = None             # Optional function handling
+
+
+class Metrics:
+    INSTANCE = None
+    TASK_TAG = "oledui.metrics"
+
+    def __init__(self, ttl_ms=2000):
+        """
+        :param ttl_ms: sampling period (cache time to live)
+        """
+        self.ttl_ms = ttl_ms
+        self._sources = {"top": top, "memory": memory_usage, "cpu_temp": cpu_temp,
+                         "rssi": sta_rssi, "ifconfig": ifconfig}
+        self._values = {}               # Cached values by source name
+        self._stamps = {}               # Sampling timestamps (ticks_ms) by source name
+        self._used = set()              # Sources read since the last sampling
+        self._event = asyncio.Event()   # Wake idle task
+        # Metrics
+        self.samples = 0                # Source queries
+        self.hits = 0                   # Cached reads
+        Metrics.INSTANCE = self
+
+    def _sample(self, name):
+        source = self._sources[name]
+        try:
+            value = source() if callable(source) else None
+        except Exception as e:
+            syslog(f"[ERR] oledui metrics {name}: {e}")
+            value = None
+        self._values[name] = value
+        self._stamps[name] = ticks_ms()
+        self.samples += 1
+        return value
+
+    def get(self, name):
+        """
+        Get cached source value
+        :param name: top, memory, cpu_temp, rssi, ifconfig
+        :return: source function output, None: unavailable source
+        """
+        self._used.add(name)
+        self._event.set()
+        stamp = self._stamps.get(name, None)
+        if stamp is None or ticks_diff(ticks_ms(), stamp) > self.ttl_ms * 2:
+            return self._sample(name)
+        self.hits += 1
+        return self._values[name]
+
+    def cfg(self, key):
+        """
+        Get cached config value (cfgget)
+        """
+        if key not in self._sources:
+            self._sources[key] = lambda: cfgget(key)
+        return self.get(key)
+
+    async def _task(self):
+        """
+        Metrics task - re-sample the used sources once per TTL
+        """
+        with micro_task(tag=Metrics.TASK_TAG) as my_task:
+            while True:
+                await my_task.feed(sleep_ms=self.ttl_ms)
+                if self._used:
+                    for name in self._used:
+                        self._sample(name)
+                    self._used.clear()
+                    my_task.out = f"samples: {self.samples} hits: {self.hits}"
+                else:
+                    # Nothing reads metrics: wait for the next read
+                    my_task.out = "idle"
+                    self._event.clear()
+                    await self._event.wait()
+
+    def run(self):
+        # [!] ASYNC TASK CREATION [1*] with async task callback + taskID (TAG) handling
+        return micro_task(tag=Metrics.TASK_TAG, task=self._task())
+
+    def status(self):
+        return {"ttl_ms": self.ttl_ms, "samples": self.samples, "hits": self.hits,
+                "sources": list(self._values.keys())}
+
+
+def get(name):
+    """Cached source value - shared Metrics instance"""
+    if Metrics.INSTANCE is None:
+        Metrics()
+    return Metrics.INSTANCE.get(name)
+
+
+def cfg(key):
+    """Cached config value - shared Metrics instance"""
+    if Metrics.INSTANCE is None:
+        Metrics()
+    return Metrics.INSTANCE.cfg(key)
@@ -0,0 +1,132 @@
+"""
+Single UI scheduler task for all periodic frames
+    - deadline ordered heap (lazy re-keying), sleeps until the next due frame
+    - woken by event: frame refresh request (clb_refresh, navigation) or dirty display area
+    - one Compositor flush per tick
+    - paused frames leave the heap (no wakeups in hibernation), resume re-schedules them
+"""
+
+import asyncio
+from heapq import heappush, heappop
+from utime import ticks_ms, ticks_diff
+from Common import micro_task, syslog
+
+MIN_PERIOD_MS = 50
+
+
+class Scheduler:
+    INSTANCE = None
+    TASK_TAG = "oledui.ui"
+
+    def __init__(self, compositor=None):
+        """
+        :param compositor: Compositor instance (flush per tick, shared wake event)
+        """
+        self.compositor = compositor
+        self.event = asyncio.Event() if compositor is None else compositor.event
+        self._frames = []               # Registered frames (index: frame id)
+        self._periods = []              # Refresh period per frame id
+        self._due = []                  # Current deadline per frame id, -1: not scheduled
+        self._heap = []                 # (deadline, frame id) - stale entries are skipped
+        self._clock = 0                 # Monotonic ms clock (ticks_ms wrap safe)
+        self._last = ticks_ms()
+        # Metrics
+        self.draws = 0
+        self.wakeups = 0
+        Scheduler.INSTANCE = self
+
+    def _now(self):
+        now = ticks_ms()
+        self._clock += ticks_diff(now, self._last)
+        self._last = now
+        return self._clock
+
+    def _schedule(self, fid, deadline):
+        self._due[fid] = deadline
+        heappush(self._heap, (deadline, fid))
+
+    def add(self, frame, period_ms=500):
+        """
+        Register periodic frame, start scheduler task
+        :param frame: object with draw() method and paused attribute
+        :param period_ms: refresh period
+        """
+        if frame in self._frames:
+            fid = self._frames.index(frame)
+            self._periods[fid] = max(MIN_PERIOD_MS, period_ms)
+        else:
+            fid = len(self._frames)
+            self._frames.append(frame)
+            self._periods.append(max(MIN_PERIOD_MS, period_ms))
+            self._due.append(-1)
+        self._schedule(fid, self._now())
+        self.event.set()
+        return self.run()
+
+    def refresh(self, frame):
+        """
+        Request immediate redraw of a registered frame
+        :return: False if frame is not registered
+        """
+        if frame not in self._frames:
+            return False
+        self._schedule(self._frames.index(frame), self._now())
+        self.event.set()
+        return True
+
+    def _tick(self):
+        """
+        Draw due frames, re-schedule them by period
+        :return: ms until the next deadline, None: nothing scheduled
+        """
+        now = self._now()
+        heap, due = self._heap, self._due
+        while heap and heap[0][0] <= now:
+            deadline, fid = heappop(heap)
+            if deadline != due[fid]:
+                continue                            # Stale entry (re-scheduled)
+            frame = self._frames[fid]
+            if frame.paused:
+                due[fid] = -1                       # Leave the heap until resume
+                continue
+            try:
+                frame.draw()
+            except Exception as e:
+                syslog(f"[ERR] oledui draw: {e}")
+            self.draws += 1
+            self._schedule(fid, now + self._periods[fid])
+        if self.compositor is not None:
+            self.compositor.flush()
+        if heap:
+            return max(0, heap[0][0] - self._now())
+        return None
+
+    async def _task(self):
+        """
+        UI scheduler task - sleep until the next due frame OR wake event
+        """
+        with micro_task(tag=Scheduler.TASK_TAG) as my_task:
+            tick_ms = MIN_PERIOD_MS if self.compositor is None else self.compositor.tick_ms
+            while True:
+                sleep_ms = self._tick()
+                # Marks of this tick are flushed: wait for the next deadline / request
+                self.event.clear()
+                my_task.out = f"frames: {len(self._frames)} draws: {self.draws} wakeups: {self.wakeups}"
+                try:
+                    if sleep_ms is None:
+                        await self.event.wait()
+                    else:
+                        await asyncio.wait_for(self.event.wait(), sleep_ms / 1000)
+                    # Coalesce the requests of this tick
+                    await my_task.feed(sleep_ms=tick_ms)
+                except asyncio.TimeoutError:
+                    pass
+                self.wakeups += 1
+
+    def run(self):
+        # [!] ASYNC TASK CREATION [1*] with async task callback + taskID (TAG) handling
+        return micro_task(tag=Scheduler.TASK_TAG, task=self._task())
+
+    def status(self):
+        return {"frames": len(self._frames), "draws": self.draws, "wakeups": self.wakeups,
+                "scheduled": sum(1 for d in self._due if d >= 0)}
@@ -1,14 +1,13 @@
 
 from utime import localtime
 from Common import syslog, micro_task, manage_task
+from async_oledui.compositor import Compositor
+from async_oledui.scheduler import Scheduler
 # Core modules
 from Time import uptime
+from async_oledui import metrics
 # Load Modules
-from LM_system import top, memory_usage, ifconfig, rssi as sta_rssi, list_stations, hosts
-try:
-    from LM_esp32 import temp as cpu_temp
-except Exception as e:
-    cpu_temp = None             # Optional function handling
+from LM_system import list_stations, hosts
 try:
     from LM_gameOfLife import next_gen as gol_nextgen, reset as gol_reset
 except:
@@ -38,6 +37,7 @@ class BaseFrame:
         self.y = y                  # Frame start Y
         self.selected = False       # Store frame instance selection - updated by Cursor
         self.paused = False         # Async task pause feature (Frame class)
+        self._key = None            # Last rendered content key (Frame render-skip)
 
     def clean(self):
         """Clean pixel frame area"""
@@ -45,14 +45,35 @@ class BaseFrame:
         if self.selected or DEBUG:
             self.display.rect(x=self.x, y=self.y, w=self.w, h=self.h, state=1, fill=False)
 
+    def invalidate(self):
+        """Mark frame area dirty - flushed by the Compositor"""
+        Compositor.invalidate(self.display, self.x, self.y, self.w, self.h)
+
+    def hit(self, x, y):
+        """Frame area contains x,y aka cursor"""
+        return self.x <= x <= self.x + self.w+1 and self.y <= y <= self.y + self.h
+
+    def highlight(self, state):
+        """
+        Set selection state - draw/remove selection border on change only
+        :return: selection state changed
+        """
+        if state == self.selected:
+            return False
+        self.selected = state
+        self.display.rect(x=self.x, y=self.y, w=self.w, h=self.h, state=1 if state or DEBUG else 0, fill=False)
+        self.invalidate()
+        if not state:
+            # Removed border: redraw the frame and the neighbours sharing its edge pixels
+            self._key = None
+            x, y, w, h = self.x, self.y, self.w, self.h
+            for edge in ((x, y, w, 1), (x, y + h - 1, w, 1), (x, y, 1, h), (x + w - 1, y, 1, h)):
+                Frame.damage(*edge, source=self)
+        return True
+
     def select(self, x, y):
         """Select frame based on x,x aka cursor"""
-        if self.x <= x <= self.x + self.w+1 and self.y <= y <= self.y + self.h:
-            if not self.selected:
-                self.selected = True
-                self.display.rect(x=self.x, y=self.y, w=self.w, h=self.h, state=1, fill=False)
-        else:
-            self.selected = False
+        self.highlight(self.hit(x, y))
         return self.selected
 
     def pause(self, state=None):
@@ -63,70 +84,126 @@ class BaseFrame:
         return self.paused
 
 
+class FrameGrid:
+    """
+    Grid-bucket spatial index of frame rectangles
+    - O(1) cursor hit-test candidates, rebuilt on layout change only
+    """
+    CELL_SHIFT = 3                  # 8x8 pixel cells
+
+    def __init__(self):
+        self.cols = 0
+        self.rows = 0
+        self.cells = []             # Frames per cell (row major), empty cells share ()
+        self.stale = True           # Layout changed - rebuild on next lookup
+
+    def rebuild(self, frames):
+        shift = FrameGrid.CELL_SHIFT
+        frames = list(frames)
+        self.cols = max([(f.x + f.w + 1) >> shift for f in frames] + [0]) + 1
+        self.rows = max([(f.y + f.h) >> shift for f in frames] + [0]) + 1
+        cells = [None] * (self.cols * self.rows)
+        for frame in frames:
+            for row in range(max(0, frame.y) >> shift, ((frame.y + frame.h) >> shift) + 1):
+                for col in range(max(0, frame.x) >> shift, ((frame.x + frame.w + 1) >> shift) + 1):
+                    index = row * self.cols + col
+                    if cells[index] is None:
+                        cells[index] = []
+                    cells[index].append(frame)
+        self.cells = [() if c is None else tuple(c) for c in cells]
+        self.stale = False
+
+    def candidates(self, x, y):
+        """
+        :return: frames of the x,y cell (exact test: frame.hit)
+        """
+        if self.stale:
+            self.rebuild(Frame.FRAMES)
+        col, row = x >> FrameGrid.CELL_SHIFT, y >> FrameGrid.CELL_SHIFT
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return self.cells[row * self.cols + col]
+        return ()
+
+    def overlapping(self, x, y, w, h):
+        """
+        :return: frames touching the x,y,w,h area (shared edge pixels included)
+        """
+        shift = FrameGrid.CELL_SHIFT
+        frames = set()
+        for row in range(max(0, y - 1) >> shift, ((y + h) >> shift) + 1):
+            for col in range(max(0, x - 1) >> shift, ((x + w) >> shift) + 1):
+                for frame in self.candidates(col << shift, row << shift):
+                    if frame.x <= x + w and x <= frame.x + frame.w and frame.y <= y + h and y <= frame.y + frame.h:
+                        frames.add(frame)
+        return frames
+
+
 class Frame(BaseFrame):
     # Collect all created Frame objects
     FRAMES = set()
+    GRID = FrameGrid()          # Spatial index of FRAMES (Cursor hit-test)
     HIBERNATE = False
 
-    def __init__(self, display, callback, width, height, x=0, y=0, tag="", hover_clb=None, press_clb=None):
+    def __init__(self, display, callback, width, height, x=0, y=0, tag="", hover_clb=None, press_clb=None, key_clb=None):
         super().__init__(display, width, height, x, y)
         # Store callbacks
         self.callback = callback        # Main callback - draw or run
         self.hover_clb = hover_clb      # Hover callback - optional
         self.press_clb = press_clb      # Press callback - optional
+        self.key_clb = key_clb          # Content key callback - optional, skip redraw on unchanged key
+        self.renders = 0                # Performed renders
+        self.skips = 0                  # Skipped renders (unchanged content key)
         self.tag = tag                  # used for frame identification
-        self._taskid = None             # used for task identification
-        self._fast_refresh = False       # Interrupt app frame task sleep - for callback reload
+        self._taskid = None             # used for frame identification (scheduled frames)
         Frame.FRAMES.add(self)          # Store - managed frames
+        Frame.GRID.stale = True         # Layout changed
 
     def draw(self):
         """
         Redraw frame
+        - skip clean, callback and flush if the content key is unchanged (None: always render)
         """
+        if self.key_clb is not None:
+            try:
+                key = self.key_clb()
+            except Exception as e:
+                syslog(f"[ERR] Frame key clb: {e}")
+                key = None
+            if key is not None and key == self._key:
+                self.skips += 1
+                return f"Skip {self._taskid} frame"
+            self._key = key
+        self.renders += 1
         self.clean()
         # Pass adjusted useful area
         try:
             self.callback(self.display, self.w - 2, self.h - 2, self.x + 1, self.y + 1)
         except Exception as e:
             syslog(f"[ERR] Frame clb: {e}")
-        self.display.show()
+        self.invalidate()
         return f"Draw {self._taskid} frame"
 
-    async def _task(self, period_ms):
-        """
-        Frame task - draw executor
-        """
-        with micro_task(tag=self._taskid) as my_task:
-            s = None
-            micro_sleep_ms = 50
-            period_ms = micro_sleep_ms if period_ms < micro_sleep_ms else period_ms
-            while True:
-                if s != self.paused:
-                    my_task.out = 'paused' if self.paused else f'refresh: {period_ms} ms'
-                    s = self.paused
-                if self.paused:
-                    await my_task.feed(sleep_ms=period_ms) # extra wait in paused mode
-                else:
-                    # Draw/Refresh frame
-                    self.draw()
-                # Async sleep - feed event loop
-                for micro_sleep in range(0, period_ms, micro_sleep_ms):
-                    if self._fast_refresh:
-                        self._fast_refresh = False
-                        break
-                    await my_task.feed(sleep_ms=micro_sleep_ms)
-
     def clb_refresh(self):
         """Fast reload app loop callbacks"""
-        self._fast_refresh = True
+        self._key = None
+        if Scheduler.INSTANCE is not None:
+            Scheduler.INSTANCE.refresh(self)
+
+    def pause(self, state=None):
+        """Pause/resume frame - resume re-schedules the periodic redraw"""
+        paused = super().pause(state)
+        if state is False:
+            self.clb_refresh()
+        return paused
 
     def run(self, tid, period_ms=500):
         """
-        Start registered callback frame task
+        Register periodic callback frame in the UI scheduler
         """
-        # [!] ASYNC TASK CREATION [1*] with async task callback + taskID (TAG) handling
         self._taskid = f"oledui.{tid}"
-        return micro_task(tag=self._taskid, task=self._task(period_ms=period_ms))
+        if Scheduler.INSTANCE is None:
+            Scheduler(Compositor.INSTANCE)
+        return Scheduler.INSTANCE.add(self, period_ms)
 
     def hover(self):
         """
@@ -146,13 +223,24 @@ class Frame(BaseFrame):
         """
         if self.press_clb is None:
             return
+        self._key = None                # Next draw replaces press output
         self.clean()
         # Pass adjusted useful area
         try:
             self.press_clb(self.display, self.w - 2, self.h - 2, self.x + 1, self.y + 1)
         except Exception as e:
             syslog(f"[ERR] Frame press clb: {e}")
-        self.display.show()
+        self.invalidate()
+
+    @staticmethod
+    def damage(x, y, w, h, source=None):
+        """
+        The x,y,w,h area was drawn over outside of the frame draw (cursor, selection border)
+        - reset the content key of the touched frames: full redraw in the next tick
+        """
+        for frame in Frame.GRID.overlapping(x, y, w, h):
+            if frame is not source:
+                frame._key = None
 
     @staticmethod
     def pause_all():
@@ -170,8 +258,9 @@ class Frame(BaseFrame):
         """
         Frame.HIBERNATE = False
         for frame in Frame.FRAMES:
-            frame.pause(False)
-            frame.draw()
+            frame.pause(False)              # scheduled frames: redraw in the next tick
+            if frame._taskid is None:
+                frame.draw()
 
     @staticmethod
     def get_frame(tag):
@@ -182,6 +271,13 @@ class Frame(BaseFrame):
             if frame.tag == tag:
                 return frame
 
+    @staticmethod
+    def render_stats():
+        """
+        Performed and skipped renders by frame tag
+        """
+        return {frame.tag: {"renders": frame.renders, "skips": frame.skips} for frame in Frame.FRAMES}
+
 
 class Cursor(BaseFrame):
     TAG = ""                # Selected/Active frame tag
@@ -189,13 +285,14 @@ class Cursor(BaseFrame):
     def __init__(self, display, width, height, x=0, y=0):
         super().__init__(display, width, height, x, y)
         self.pos_xy = (x, y)
+        self._hits = ()             # Selected frames under the cursor
 
     def draw(self):
         x, y = self.pos_xy
         new_x = x if x-1 < 0 else x-1
         new_y = y+1
         self.display.rect(new_x, new_y, 2, 2, 1)  # draw new cursor
-        self.display.show()
+        Compositor.invalidate(self.display, new_x, new_y, 2, 2)
 
     def update(self, x, y):
         """
@@ -205,21 +302,29 @@ class Cursor(BaseFrame):
         """
         self.clean()
         self.pos_xy = (x, y)
-        for frame in Frame.FRAMES:
-            if frame.select(x, y):          # select/deselect frame based on coordinates
-                # Frame was found
-                if frame.tag != Cursor.TAG:
-                    # Change event
-                    if Cursor.TAG == "footer" and PageBarFrame.INSTANCE:
-                        # Leave footer event - clean selection
-                        PageBarFrame.INSTANCE.selected = False
-                        PageBarFrame.INSTANCE.draw()
-                    # Update TAG
-                    Cursor.TAG = frame.tag
-                    # Handle hover action
-                    has_hover = frame.hover()
-                    if not has_hover:
-                        PopUpFrame.INSTANCE.cancel()
+        # Frame content under the new cursor is drawn over
+        Frame.damage(x - 1, y + 1, 2, 2)
+        hits = [frame for frame in Frame.GRID.candidates(x, y) if frame.hit(x, y)]
+        # Deselect left frames - redraw changed selections only
+        for frame in self._hits:
+            if frame not in hits:
+                frame.highlight(False)
+        self._hits = hits
+        for frame in hits:
+            frame.highlight(True)
+            # Frame was found
+            if frame.tag != Cursor.TAG:
+                # Change event
+                if Cursor.TAG == "footer" and PageBarFrame.INSTANCE:
+                    # Leave footer event - clean selection
+                    PageBarFrame.INSTANCE.selected = False
+                    PageBarFrame.INSTANCE.draw()
+                # Update TAG
+                Cursor.TAG = frame.tag
+                # Handle hover action
+                has_hover = frame.hover()
+                if not has_hover:
+                    PopUpFrame.INSTANCE.cancel()
         self.draw()
 
     def clean(self):
@@ -228,6 +333,9 @@ class Cursor(BaseFrame):
         """
         x, y = self.pos_xy
         self.display.rect(x - 1, y + 1, 2, 2, 0)
+        Compositor.invalidate(self.display, x - 1, y + 1, 2, 2)
+        # Erased frame content under the cursor
+        Frame.damage(x - 1, y + 1, 2, 2)
 
 
 class PopUpFrame(BaseFrame):
@@ -266,7 +374,7 @@ class PopUpFrame(BaseFrame):
         if callable(self.callback):
             text_x_offset = 15
             self.callback(self.display, self._inner_w, self._inner_h, self._inner_x+text_x_offset, self._inner_y+4)
-        self.display.show()
+        self.invalidate()
         self.cursor_draw()
         return f"Draw {self._taskid} frame"
 
@@ -290,13 +398,14 @@ class PopUpFrame(BaseFrame):
         # Format message: fitting and \n parsing
         text_x_offset = 12
         self.pageui.write_lines(msg, self.display, self._inner_x + text_x_offset, self._inner_y+4, line_limit=3)
-        self.display.show()
+        self.invalidate()
         return f"Draw textbox frame"
 
     def cancel(self):
         if self.selected:
             self.selected = False
             self.clean()
+            self.invalidate()
             self.app_frame.pause(False)
             if self._taskid is not None:
                 self._taskid = None
@@ -383,9 +492,11 @@ class ScreenSaver(BaseFrame):
 
 class AppFrame(Frame):
     PAGES = []
+    KEYS = []           # Optional page content key callbacks (None: always render)
 
     def __init__(self,  display, cursor_draw, width, height, x=0, y=0, tag="app", page=0):
-        super().__init__(display, self._application, width, height, x=x, y=y, tag=tag)
+        super().__init__(display, self._application, width, height, x=x, y=y, tag=tag,
+                         key_clb=self._application_key)
         self.active_page_index = page
         self.cursor_draw = cursor_draw
         self.press_output = ""
@@ -402,13 +513,26 @@ class AppFrame(Frame):
                 display.text(e, x, y)
         self.cursor_draw()
 
+    def _application_key(self):
+        if len(AppFrame.PAGES) > 0:
+            key_clb = AppFrame.KEYS[self.active_page_index]
+            if callable(key_clb):
+                return self.active_page_index, key_clb()
+        return None
+
     @staticmethod
-    def add_page(page):
+    def add_page(page, key=None):
+        """
+        :param page: page callback func(display, w, h, x, y) or list of page callbacks
+        :param key: optional content key callback of the single page: redraw only on key change
+        """
         if callable(page):
             AppFrame.PAGES.append(page)     # add single page
+            AppFrame.KEYS.append(key)
             return True
         if isinstance(page, list):
             AppFrame.PAGES += page          # add list of pages
+            AppFrame.KEYS += [None] * len(page)
             return True
         return False
 
@@ -435,17 +559,21 @@ class HeaderBarFrames:
         self.display = display
         self.cursor_draw = cursor_draw
         self.timer = [timer, timer]     #[0] default value, [1] timer cnt
+        self._time_text = None          # time text sampled by the content key
+        self._usage = None              # cpu, mem bars sampled by the content key
+        self._rssi_value = None         # rssi ratio, strength sampled by the content key
         # Create header: time frame
         time_frame = Frame(self.display, self._time, width=66, height=10, x=32, y=0, tag="time",
-                           hover_clb=self._time_hover)
+                           hover_clb=self._time_hover, key_clb=self._time_key)
         time_frame.run("time", period_ms=1000)
         # Create header: cpu,mem metrics
         cpu_mem_frame = Frame(self.display, self._cpu_mem, width=12, height=10, x=116, y=0, tag="cpu_mem",
-                              hover_clb=self._cpu_mem_hover)
+                              hover_clb=self._cpu_mem_hover, key_clb=self._cpu_mem_key)
         cpu_mem_frame.run('cpu_mem', period_ms=2100)
+        self._bar_h = cpu_mem_frame.h - 2   # cpu, mem bar height (frame useful area)
         # Create header: wifi rssi
         rssi_frame = Frame(self.display, self._rssi, width=10, height=10, x=0, y=0, tag="rssi",
-                           hover_clb=self._rssi_hover)
+                           hover_clb=self._rssi_hover, key_clb=self._rssi_key)
         rssi_frame.run('rssi', period_ms=4200)
         # Create header: timer frame (auto sleep)
         if isinstance(timer, int):
@@ -453,8 +581,8 @@ class HeaderBarFrames:
                                 hover_clb=self._timer_hover)
             timer_frame.run("timer", period_ms=int((timer*1000)/24))
 
-    def _time(self, display, w, h, x, y):
-        # Built-in: time widget frame
+    def _time_key(self):
+        # Displayed time text - sampled once for the key and the draw
         ltime = localtime()
         try:
             h = f"0{ltime[-5]}" if len(str(ltime[-5])) < 2 else ltime[-5]
@@ -462,7 +590,14 @@ class HeaderBarFrames:
             s = f"0{ltime[-3]}" if len(str(ltime[-3])) < 2 else ltime[-3]
         except:
             h, m, s = 0, 0, 0
-        display.text(f"{h}:{m}:{s}", x, y)
+        self._time_text = f"{h}:{m}:{s}"
+        return self._time_text
+
+    def _time(self, display, w, h, x, y):
+        # Built-in: time widget frame
+        if self._time_text is None:
+            self._time_key()
+        display.text(self._time_text, x, y)
         self.cursor_draw()
 
     def _time_hover(self, display, w, h, x, y):
@@ -502,14 +637,21 @@ class HeaderBarFrames:
     def reset_timer(self):
         self.timer[1] = self.timer[0]
 
-    def _cpu_mem(self, display, w, h, x, y):
-        # Built-in: cpu_mem widget frame
-        sys_usage = top()
+    def _cpu_mem_key(self):
+        # Drawn bar heights (pixels) and fill indicators - redraw on visible change
+        sys_usage = metrics.get("top") or {}
         cpu = sys_usage.get('CPU load [%]', 100)
         cpu = 100 if cpu > 100 else cpu  # limit cpu overload in visualization
         mem = sys_usage.get('Mem usage [%]', 100)
-        _cpu_limit, _mem_limit = cpu > 90, mem > 70  # fill indicator (limit)
-        _cpu, _mem = int(h * (cpu / 100))+1, int(h * (mem / 100))+1
+        h = self._bar_h
+        self._usage = int(h * (cpu / 100))+1, int(h * (mem / 100))+1, cpu > 90, mem > 70
+        return self._usage
+
+    def _cpu_mem(self, display, w, h, x, y):
+        # Built-in: cpu_mem widget frame
+        if self._usage is None:
+            self._cpu_mem_key()
+        _cpu, _mem, _cpu_limit, _mem_limit = self._usage     # bar heights, fill indicator (limit)
         width = int((w-2)/2)
         y_base = y+h
         spacer = 3
@@ -518,13 +660,14 @@ class HeaderBarFrames:
         self.cursor_draw()
 
     def _cpu_mem_hover(self, display, w, h, x, y):
-        sys_usage = top()                                   # Get CPU and MEM usage percentage
-        mem_kb = int(memory_usage().get("mem_used", 0) / 1000)     # Get MEM usage in kb
+        sys_usage = metrics.get("top") or {}                # Get CPU and MEM usage percentage
+        mem_kb = int((metrics.get("memory") or {}).get("mem_used", 0) / 1000)     # Get MEM usage in kb
         cpu = sys_usage.get('CPU load [%]', 100)
         mem = sys_usage.get('Mem usage [%]', 100)
         cpu_t = ""
-        if callable(cpu_temp):
-            _cpu_t = int(list(cpu_temp().values())[0])
+        temp = metrics.get("cpu_temp")                      # None: not available
+        if temp:
+            _cpu_t = int(list(temp.values())[0])
             cpu_t = f"{_cpu_t}C" if _cpu_t > 0 else ""
         display.text(f"CPU {cpu}%  {cpu_t}", x, y)
         display.text(f"MEM {mem}%", x, y+10)
@@ -533,16 +676,20 @@ class HeaderBarFrames:
 
     @staticmethod
     def __rssi_into():
-        value = list(sta_rssi().values())[0]
+        value = list(metrics.get("rssi").values())[0]
         min_rssi, max_rssi = -90, -40
         rssi = max(min_rssi, min(max_rssi, value))
         rssi_ratio = ((rssi - min_rssi) / (max_rssi - min_rssi))
         return round(rssi_ratio, 1), value
 
+    def _rssi_key(self):
+        self._rssi_value = self.__rssi_into()
+        return self._rssi_value[0]
+
     def _rssi(self, display, w, h, x, y):
         # Built-in: _rssi widget frame
         x = min(x-1, 0)                     # visual offset in start_x
-        rssi_ratio, _ = self.__rssi_into()
+        rssi_ratio, _ = self.__rssi_into() if self._rssi_value is None else self._rssi_value
         # Top level line indicator
         display.line(x, y, x+w, y)
         # Calculate lines
@@ -556,7 +703,7 @@ class HeaderBarFrames:
         self.cursor_draw()
 
     def _rssi_hover(self, display, w, h, x, y):
-        nw_mode = ifconfig()[0]
+        nw_mode = metrics.get("ifconfig")[0]
         if nw_mode == "STA":
             rssi_ratio, strength = self.__rssi_into()
             display.text(f"{nw_mode} mode", x, y)
@@ -8,11 +8,13 @@ This module exposes a few basic functions over micrOS:
 - off()                → LED OFF
 - toggle()             → toggle LED state
 - blink(count=10, delay_ms=200) → blink LED N times with delay
+- state()              → LED state (also mqtt_client shadow provider)
 - help()               → list available functions
 
 All functions are callable from ShellCli / WebCli.
 """
 
+from sys import modules
 from machine import Pin
 from microIO import bind_pin
 import utime as time  # Micropython-friendly time module
@@ -34,9 +36,24 @@ def load(pin_number=26):
         # Reserve this pin for the 'led' tag and get the real pin number
         pin = bind_pin('led', pin_number)
         LED = Pin(pin, Pin.OUT)
+        _shadow_register()
     return LED
 
 
+def _shadow_register():
+    """
+    Register state() as mqtt_client device-state shadow provider.
+    Optional: only if the mqtt_client module is already loaded.
+    """
+    if 'LM_mqtt_client' not in modules:
+        return
+    try:
+        from LM_mqtt_client import shadow_provider
+        shadow_provider("blinky", state)
+    except ImportError:
+        pass
+
+
 def on():
     """
     Turn the LED ON.
@@ -67,6 +84,14 @@ def toggle():
     return "Blinky: LED ON" if pin.value() else "Blinky: LED OFF"
 
 
+def state():
+    """
+    Get LED state.
+    :return: dict with led state (0/1)
+    """
+    return {"led": load().value()}
+
+
 def blink(count=10, delay_ms=200):
     """
     Blink the LED a given number of times with blocking delay.
@@ -99,4 +124,5 @@ def help(widgets=False):
         "off",
         "toggle",
         "blink count=10 delay_ms=200",
+        "state",
     )
@@ -1,3 +1,4 @@
+from sys import modules
 from random import randint
 from neopixel import NeoPixel
 from machine import Pin
@@ -147,9 +148,23 @@ def load(width=8, height=8):
     if NeoPixelMatrix.INSTANCE is None:
         NeoPixelMatrix(width=width, height=height, pin=bind_pin('neop'))
         web_endpoint('matrixDraw', _web_endpoint_clb, auto_enable=False)
+        _shadow_register()
     return NeoPixelMatrix.INSTANCE
 
 
+def _shadow_register():
+    """
+    Register status as mqtt_client device-state shadow provider (optional, if mqtt_client is loaded)
+    """
+    if 'LM_mqtt_client' not in modules:
+        return
+    try:
+        from LM_mqtt_client import shadow_provider
+        shadow_provider("neomatrix", status)
+    except ImportError:
+        pass
+
+
 def _web_endpoint_clb():
     try:
         with open(web_dir('matrix_draw.html'), 'r') as html: